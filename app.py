@@ -5,26 +5,34 @@ ClubMusic - 纯FastAPI实现的网页音乐播放器
 
 import os
 import sys
-import json
 import time
 import logging
 import hashlib
 import random
+import re
 import subprocess
+import orjson
+from collections import OrderedDict
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple, Optional
 from urllib.parse import unquote
 
 logger = logging.getLogger(__name__)
 
 from fastapi import FastAPI, Request, File, UploadFile, HTTPException
+from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, FileResponse, HTMLResponse, StreamingResponse, Response
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from pydantic import BaseModel, ConfigDict
 from contextlib import asynccontextmanager
-import uuid
 import asyncio
-import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import anyio.to_thread
 
 # ============================================
 # 初始化模块
@@ -40,7 +48,6 @@ if sys.stdout.encoding != "utf-8":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
 
 from models import (
-    Song,
     LocalSong,
     StreamSong,
     Playlist,
@@ -87,6 +94,12 @@ DEFAULT_PLAYLIST_ID = "default"
 CURRENT_PLAYLIST_ID = DEFAULT_PLAYLIST_ID
 PLAYBACK_HISTORY = PLAYER.playback_history
 
+# 网络歌曲 URL 前缀（str.startswith 支持元组，一次调用完成匹配）
+_HTTP_PREFIXES = ("http://", "https://")
+
+# YouTube 视频 ID 提取（模块加载时编译一次）
+_YT_ID_RE = re.compile(r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})')
+
 # 初始化默认歌单
 def _init_default_playlist():
     """初始化系统默认歌单"""
@@ -100,9 +113,34 @@ def _init_default_playlist():
     return default_pl
 
 # 确保默认歌单存在
-_init_default_playlist()
+# 当前歌单对象引用：默认歌单不可删除，服务运行期间对象不变，
+# 处理请求时直接使用该引用，省去每次按 CURRENT_PLAYLIST_ID 查找
+CURRENT_PLAYLIST_REF = _init_default_playlist()
+# 当前歌单的歌曲列表：清空/重排均原地修改，列表对象在运行期间保持不变，
+# 切歌、查询队列时直接使用，无需再经歌单对象取属性
+CURRENT_SONGS = CURRENT_PLAYLIST_REF.songs
 
 # ==================== 浏览器检测函数 ====================
+# User-Agent 中与浏览器判断相关的标记：一次正则扫描取出全部标记，再按优先级判断
+_UA_TOKEN_RE = re.compile(r"opr|opera|edg|chrome|firefox|safari", re.IGNORECASE)
+
+# 检测顺序很重要：需要考虑包含关系
+# - Opera 必须在 Chrome 之前（Opera 基于 Chromium）
+# - Edge 在 UA 中显示为 "Edg"，且同样包含 Chrome 标记
+# - Safari 的 UA 包含 "Safari"，Chrome/Edge 也包含，因此放在最后
+_BROWSER_PRIORITY = (
+    ("opr", "opera"),
+    ("opera", "opera"),
+    ("edg", "edge"),
+    ("chrome", "chrome"),
+    ("firefox", "firefox"),
+    ("safari", "safari"),
+)
+
+def _ua_tokens(user_agent: str) -> set:
+    """提取 User-Agent 中出现的浏览器标记（小写）"""
+    return {token.lower() for token in _UA_TOKEN_RE.findall(user_agent)}
+
 def detect_browser(user_agent: str) -> str:
     """
     从 User-Agent 字符串检测浏览器类型
@@ -113,80 +151,69 @@ def detect_browser(user_agent: str) -> str:
     Returns:
         str: 浏览器类型 (safari, edge, chrome, firefox, opera, unknown)
     """
-    ua = user_agent.lower()
-    
-    # 检测顺序很重要：需要考虑包含关系
-    # Opera 检测（必须在 Chrome 之前，因为 Opera 基于 Chromium）
-    if 'opr' in ua or 'opera' in ua:
-        return 'opera'
-    # Edge 在 UA 中显示为 "Edg"（注意不是 Edge）
-    elif 'edg' in ua:
-        return 'edge'
-    # Chrome 检测（必须排除 Edge，因为 Edge Chromium 也包含 chromium）
-    elif 'chrome' in ua and 'edg' not in ua:
-        return 'chrome'
-    # Firefox 检测
-    elif 'firefox' in ua:
-        return 'firefox'
-    # Safari 的 UA 包含 "Safari" 但不包含 "Chrome" 或 "Edg"
-    elif 'safari' in ua and 'chrome' not in ua and 'edg' not in ua:
-        return 'safari'
-    else:
-        return 'unknown'
+    tokens = _ua_tokens(user_agent)
+    for token, browser in _BROWSER_PRIORITY:
+        if token in tokens:
+            return browser
+    return 'unknown'
 
 
 # ==================== Safari 浏览器自适应优化 ====================
-def detect_browser_and_apply_config(request: Request) -> dict:
-    """根据User-Agent检测浏览器并应用对应的流媒体配置"""
-    user_agent = request.headers.get("user-agent", "").lower()
-    
-    config = {
-        "browser": "Unknown",
-        "keepalive_interval": 0.5,      # 心跳间隔（秒）
-        "chunk_size": 256 * 1024,        # 块大小（字节）
-        "queue_timeout": 1.0,            # 队列超时（秒）
-        "force_flush": False,            # 强制刷新
-        "max_consecutive_empty": 150,    # 最大连续空数据次数
-    }
-    
-    if "safari" in user_agent and "chrome" not in user_agent:
-        config.update({
-            "browser": "Safari",
-            "keepalive_interval": 0.5,   # Safari：生产环境优化心跳（每500ms，降低CPU）
-            "chunk_size": 128 * 1024,     # 🔧 优化2：改为128KB（更低延迟）
-            "queue_timeout": 1.0,        # Safari：生产环境增加超时到1.0s（提高容错）
-            "force_flush": True,         # Safari：强制立即发送
-            "max_consecutive_empty": 400,  # 🔧 优化3：增加到400（更宽容，适应生产网络延迟）
-        })
-    elif "edge" in user_agent or "edg" in user_agent:
-        config.update({
-            "browser": "Edge",
-            "keepalive_interval": 0.5,
-            "chunk_size": 256 * 1024,
-            "queue_timeout": 1.0,
-            "force_flush": False,
-            "max_consecutive_empty": 150,
-        })
-    elif "firefox" in user_agent:
-        config.update({
-            "browser": "Firefox",
-            "keepalive_interval": 0.4,
-            "chunk_size": 128 * 1024,
-            "queue_timeout": 0.8,
-            "force_flush": False,
-            "max_consecutive_empty": 150,
-        })
-    elif "chrome" in user_agent:
-        config.update({
-            "browser": "Chrome",
-            "keepalive_interval": 0.5,
-            "chunk_size": 256 * 1024,
-            "queue_timeout": 1.0,
-            "force_flush": False,
-            "max_consecutive_empty": 150,
-        })
+# 各浏览器的流媒体配置为常量：模块加载时构造一次，只读视图防止调用方误改共享对象
+_UNKNOWN_STREAM_CONFIG = MappingProxyType({
+    "browser": "Unknown",
+    "keepalive_interval": 0.5,      # 心跳间隔（秒）
+    "chunk_size": 256 * 1024,        # 块大小（字节）
+    "queue_timeout": 1.0,            # 队列超时（秒）
+    "force_flush": False,            # 强制刷新
+    "max_consecutive_empty": 150,    # 最大连续空数据次数
+})
+_SAFARI_STREAM_CONFIG = MappingProxyType({
+    "browser": "Safari",
+    "keepalive_interval": 0.5,   # Safari：生产环境优化心跳（每500ms，降低CPU）
+    "chunk_size": 128 * 1024,     # 🔧 优化2：改为128KB（更低延迟）
+    "queue_timeout": 1.0,        # Safari：生产环境增加超时到1.0s（提高容错）
+    "force_flush": True,         # Safari：强制立即发送
+    "max_consecutive_empty": 400,  # 🔧 优化3：增加到400（更宽容，适应生产网络延迟）
+})
+_EDGE_STREAM_CONFIG = MappingProxyType({
+    "browser": "Edge",
+    "keepalive_interval": 0.5,
+    "chunk_size": 256 * 1024,
+    "queue_timeout": 1.0,
+    "force_flush": False,
+    "max_consecutive_empty": 150,
+})
+_FIREFOX_STREAM_CONFIG = MappingProxyType({
+    "browser": "Firefox",
+    "keepalive_interval": 0.4,
+    "chunk_size": 128 * 1024,
+    "queue_timeout": 0.8,
+    "force_flush": False,
+    "max_consecutive_empty": 150,
+})
+_CHROME_STREAM_CONFIG = MappingProxyType({
+    "browser": "Chrome",
+    "keepalive_interval": 0.5,
+    "chunk_size": 256 * 1024,
+    "queue_timeout": 1.0,
+    "force_flush": False,
+    "max_consecutive_empty": 150,
+})
+
+def detect_browser_and_apply_config(request: Request) -> MappingProxyType:
+    """根据User-Agent检测浏览器并返回对应的流媒体配置（共享只读对象，需修改时请先复制）"""
+    tokens = _ua_tokens(request.headers.get("user-agent", ""))
     
-    return config
+    if "safari" in tokens and "chrome" not in tokens:
+        return _SAFARI_STREAM_CONFIG
+    elif "edg" in tokens:
+        return _EDGE_STREAM_CONFIG
+    elif "firefox" in tokens:
+        return _FIREFOX_STREAM_CONFIG
+    elif "chrome" in tokens:
+        return _CHROME_STREAM_CONFIG
+    return _UNKNOWN_STREAM_CONFIG
 
 
 # ==================== 推流配置读取函数 ====================
@@ -196,18 +223,79 @@ def detect_browser_and_apply_config(request: Request) -> dict:
 # 定义应用生命周期处理
 # ============================================
 
+# 歌单自动保存间隔（秒）：窗口内的多次修改合并为一次写盘
+PLAYLISTS_SAVE_INTERVAL = 0.25
+# 写盘失败（磁盘已满、无权限等）后重试前的等待时间（秒）
+PLAYLISTS_SAVE_RETRY_INTERVAL = 5.0
+
+async def _playlists_autosave_loop(dirty_event: asyncio.Event):
+    """后台任务：等待歌单修改通知，延迟一个窗口后合并写盘（序列化在事件循环，写文件在线程池）"""
+    while True:
+        await dirty_event.wait()
+        await asyncio.sleep(PLAYLISTS_SAVE_INTERVAL)
+        dirty_event.clear()
+        if not PLAYLISTS_MANAGER.has_unsaved_changes():
+            continue
+        try:
+            version, payload = PLAYLISTS_MANAGER.snapshot()
+            await asyncio.to_thread(PLAYLISTS_MANAGER.write_snapshot, version, payload)
+        except Exception as e:
+            logger.error(f"[歌单] 自动保存失败，{PLAYLISTS_SAVE_RETRY_INTERVAL:g} 秒后重试: {e}")
+            # snapshot() 已清除脏标记，重新标记，确保这批修改会被重试，关闭时也会写盘
+            PLAYLISTS_MANAGER.mark_dirty()
+            await asyncio.sleep(PLAYLISTS_SAVE_RETRY_INTERVAL)
+
+
+def _warm_up_yt_dlp():
+    """预先导入 yt-dlp（首次导入需加载大量提取器模块，耗时明显）"""
+    try:
+        import yt_dlp  # noqa: F401
+        logger.info("yt-dlp 已预加载")
+    except Exception as e:
+        logger.warning(f"预加载 yt-dlp 失败: {e}")
+
+
+# 阻塞调用线程池大小：MPV IPC、yt-dlp、本地搜索等均通过线程池执行，
+# 默认上限（CPU 数 + 4）在慢速 yt-dlp 请求堆积时会让 /status 轮询排队
+BLOCKING_THREADPOOL_SIZE = 100
+
+def _configure_threadpool():
+    """统一线程池上限：asyncio.to_thread 与 Starlette 同步端点共用同一规模"""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_THREADPOOL_SIZE, thread_name_prefix="blocking")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = BLOCKING_THREADPOOL_SIZE
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理（启动和关闭事件）"""
     # 启动事件
+    _configure_threadpool()
     logger.info("应用启动完成")
     auto_fill_and_play_if_idle()
+    # 后台预热 yt-dlp，避免第一次搜索/解析请求承担导入开销
+    threading.Thread(target=_warm_up_yt_dlp, daemon=True, name="yt-dlp-warmup").start()
+    # 歌单修改时唤醒自动保存任务（mark_dirty 可能来自工作线程，需线程安全地设置事件）
+    loop = asyncio.get_running_loop()
+    playlists_dirty = asyncio.Event()
+    PLAYLISTS_MANAGER.set_dirty_listener(lambda: loop.call_soon_threadsafe(playlists_dirty.set))
+    if PLAYLISTS_MANAGER.has_unsaved_changes():
+        playlists_dirty.set()
+    autosave_task = asyncio.create_task(_playlists_autosave_loop(playlists_dirty))
     
     yield  # 应用运行期间
     
     # 关闭事件
     logger.info("应用正在关闭...")
 
+    # 停止自动保存并写入尚未落盘的歌单修改
+    autosave_task.cancel()
+    PLAYLISTS_MANAGER.set_dirty_listener(None)
+    if PLAYLISTS_MANAGER.has_unsaved_changes():
+        await asyncio.to_thread(PLAYLISTS_MANAGER.save)
+
     # 清理 MPV 进程
     try:
         if PLAYER and PLAYER.mpv_process:
@@ -241,7 +329,8 @@ app = FastAPI(
     title="ClubMusic",
     description="ClubMusic - 网页音乐播放器",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # 添加 CORS 中间件（允许跨域请求）
@@ -253,6 +342,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 不压缩的流式接口：压缩缓冲会让逐行推送攒到结束才发出
+_GZIP_EXCLUDED_PATHS = frozenset({"/search_song/stream"})
+
+class _StreamAwareGZipMiddleware(GZipMiddleware):
+    """跳过流式接口的 GZip 中间件（不依赖各 Starlette 版本对 Content-Encoding 头的处理）"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in _GZIP_EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# 压缩较大的 JSON 响应（/tree、/playlist_songs 等），小于 1KB 的轮询响应不压缩
+app.add_middleware(_StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+def _content_etag(body: bytes) -> str:
+    """按内容生成弱 ETag：同一内容的 gzip 与未压缩表示共用，按弱比较语义匹配"""
+    return 'W/"' + hashlib.md5(body).hexdigest() + '"'
+
+# 错误信息最大长度（避免 yt-dlp 等异常携带超长信息）
+ERROR_MESSAGE_MAX_LEN = 512
+
+# 播放控制、设置等修改类接口的响应不允许被浏览器或代理缓存
+_NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
+def _no_store(payload: dict) -> Response:
+    """修改类接口的成功响应：orjson 直接序列化并附带 Cache-Control: no-store"""
+    return Response(
+        content=orjson.dumps(payload),
+        media_type="application/json",
+        headers=_NO_STORE_HEADERS
+    )
+
+def _error(exc, code: int = 500) -> Response:
+    """统一的错误响应：{"status": "ERROR", "error": ...}，直接返回 orjson 序列化的字节"""
+    return Response(
+        content=orjson.dumps({"status": "ERROR", "error": str(exc)[:ERROR_MESSAGE_MAX_LEN]}),
+        status_code=code,
+        media_type="application/json"
+    )
+
 
 # ============================================
 # 自动填充队列并自动播放（后台空闲1分钟后无歌曲自动填充）
@@ -271,7 +401,6 @@ def auto_fill_and_play_if_idle():
     """
     import time
     import random
-    import re
 
     def build_youtube_url_from_id(video_id: str):
         if not video_id:
@@ -327,7 +456,7 @@ def auto_fill_and_play_if_idle():
 
             # 若类型未明确，依据 URL 判断网络/YouTube
             if not typ or typ == "local":
-                if url.startswith("http://") or url.startswith("https://"):
+                if url.startswith(_HTTP_PREFIXES):
                     if "youtube.com" in url.lower() or "youtu.be" in url.lower():
                         typ = "youtube"
                     else:
@@ -371,7 +500,7 @@ def auto_fill_and_play_if_idle():
             history_items = []
             try:
                 # PLAYBACK_HISTORY 是全局的 PlayHistory 实例
-                history_items = PLAYBACK_HISTORY.get_all() if hasattr(PLAYBACK_HISTORY, 'get_all') else []
+                history_items = PLAYBACK_HISTORY.get_all()
             except Exception as he:
                 logger.debug(f"[自动填充] 读取播放历史失败: {he}")
 
@@ -482,7 +611,8 @@ def auto_fill_and_play_if_idle():
             playlist.songs.append(song_dict)
 
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        # 后台线程中只标记脏数据，由事件循环上的自动保存任务写盘
+        PLAYLISTS_MANAGER.mark_dirty()
         logger.info(f"[自动填充] 已添加 {len(selected)} 首歌曲到默认歌单 (包含网络歌曲: {sum(1 for x in selected if x['type'] in ('youtube','stream'))})")
 
         # 自动播放第一首（如果MPV可用）
@@ -558,18 +688,61 @@ async def get_preview_image():
     
     raise HTTPException(status_code=404, detail="Preview image not found")
 
+# 文件名中带内容哈希的资源（如 app.3f2a9c1d.js）内容永不变化，可长期缓存
+_HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.\w+$")
+
+class CachedStaticFiles(StaticFiles):
+    """缓存路径解析结果的静态文件服务
+
+    StaticFiles 每次请求都会对各目录做 realpath 解析再 stat 文件，
+    重复请求同一资源时复用上次解析出的完整路径，只重新 stat 该文件一次，
+    文件编辑后（mtime/大小变化）立即生成新的 ETag。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._path_cache = {}
+
+    def lookup_path(self, path: str):
+        full_path = self._path_cache.get(path)
+        if full_path is not None:
+            try:
+                current = os.stat(full_path)
+            except OSError:
+                # 文件已删除或不可访问：丢弃缓存，走完整查找
+                self._path_cache.pop(path, None)
+            else:
+                # 始终返回本次 stat 结果：ETag/Last-Modified 随 mtime、大小变化
+                return full_path, current
+        full_path, stat_result = super().lookup_path(path)
+        # 未找到的路径不缓存，新建的文件能立即访问
+        if stat_result is not None:
+            if len(self._path_cache) >= 512:
+                self._path_cache.clear()
+            self._path_cache[path] = full_path
+        return full_path, stat_result
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            # 带哈希的资源长期缓存；其余资源每次用 ETag 重新验证（304）
+            response.headers["Cache-Control"] = (
+                "public, max-age=31536000, immutable"
+                if _HASHED_ASSET_RE.search(path) else "no-cache"
+            )
+        return response
+
 try:
     static_dir = _get_resource_path("static")
     if os.path.isdir(static_dir):
         logger.debug(f"静态文件目录: {static_dir}")
-        app.mount("/static", StaticFiles(directory=static_dir, check_dir=True), name="static")
+        app.mount("/static", CachedStaticFiles(directory=static_dir, check_dir=True), name="static")
         logger.info(f"静态文件已挂载到 /static")
     else:
         logger.error(f"静态文件目录不存在: {static_dir}")
 except Exception as e:
     logger.warning(f"无法挂载static文件夹: {e}")
-    import traceback
-    traceback.print_exc()
+    logger.debug("[静态文件] 异常堆栈", exc_info=True)
 
 # ============================================
 # 常见封面文件名
@@ -623,7 +796,8 @@ def _extract_embedded_cover_bytes(file_path: str) -> bytes:
                 if 'covr' in audio.tags:
                     covers = audio.tags['covr']
                     if covers:
-                        return bytes(covers[0])
+                        # MP4Cover 本身就是 bytes 子类，直接返回，避免整张图片再复制一次
+                        return covers[0]
         
         # FLAC 格式
         if isinstance(audio, FLAC):
@@ -651,8 +825,6 @@ async def get_cover(file_path: str):
     1. 查找目录中的 cover.jpg/folder.jpg 等
     """
     try:
-        from fastapi.responses import Response
-        
         # URL 解码
         decoded_path = unquote(file_path)
         
@@ -714,15 +886,42 @@ async def get_cover(file_path: str):
 # HTML 路由
 # ============================================
 
+# 主页模板是静态文件，启动时读取一次并缓存，避免每次请求都在事件循环里读盘
+# FASTAPI_DEBUG=1 时每次请求重新读取，便于前端开发时直接刷新
+INDEX_HTML_DEBUG = os.environ.get("FASTAPI_DEBUG") == "1"
+
+def _load_index_html():
+    """读取主页模板，返回 (字节, ETag)"""
+    body = Path(_get_resource_path("templates/index.html")).read_bytes()
+    return body, _content_etag(body)
+
+try:
+    INDEX_HTML, INDEX_HTML_ETAG = _load_index_html()
+    INDEX_HTML_ERROR = None
+except OSError as e:
+    INDEX_HTML, INDEX_HTML_ETAG = None, ""
+    INDEX_HTML_ERROR = str(e)
+    logger.error(f"读取主页模板失败: {e}")
+
 @app.get("/")
-async def index():
+async def index(request: Request):
     """返回主页面"""
-    try:
-        index_path = _get_resource_path("templates/index.html")
-        with open(index_path, "r", encoding="utf-8") as f:
-            return HTMLResponse(f.read())
-    except Exception as e:
-        return HTMLResponse(f"<h1>错误</h1><p>{str(e)}</p>", status_code=500)
+    body, etag = INDEX_HTML, INDEX_HTML_ETAG
+    if INDEX_HTML_DEBUG:
+        try:
+            body, etag = await asyncio.to_thread(_load_index_html)
+        except OSError as e:
+            body, etag = None, ""
+            logger.error(f"读取主页模板失败: {e}")
+    if body is None:
+        return HTMLResponse(f"<h1>错误</h1><p>{INDEX_HTML_ERROR or '主页模板不可用'}</p>", status_code=500)
+    if _etag_matches(request, etag):
+        return _not_modified(etag, "no-cache")
+    return Response(
+        content=body,
+        media_type="text/html; charset=utf-8",
+        headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    )
 
 
 
@@ -732,43 +931,244 @@ async def index():
 # API 路由：歌单管理
 # ============================================
 
+# /playlist_songs 响应缓存：歌单数据版本号未变时直接返回已序列化的字节
+_playlist_songs_cache = {"version": -1, "body": b""}
+
 @app.get("/playlist_songs")
 async def get_playlist_songs():
     """获取当前歌单的所有歌曲"""
-    playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
-    songs = playlist.songs if playlist else []
-    return {
-        "status": "OK",
-        "songs": songs,
-        "playlist_id": CURRENT_PLAYLIST_ID,
-        "playlist_name": playlist.name if playlist else "--"
-    }
+    version = PLAYLISTS_MANAGER.version
+    if _playlist_songs_cache["version"] != version:
+        _playlist_songs_cache["body"] = orjson.dumps({
+            "status": "OK",
+            "songs": CURRENT_SONGS,
+            "playlist_id": CURRENT_PLAYLIST_ID,
+            "playlist_name": CURRENT_PLAYLIST_REF.name
+        })
+        _playlist_songs_cache["version"] = version
+    return Response(content=_playlist_songs_cache["body"], media_type="application/json")
+
+# /tree 响应缓存：文件树对象不变（启动时扫描一次）时复用已序列化的响应体和 ETag
+_tree_cache = {"tree": None, "body": b"", "etag": ""}
 
 @app.get("/tree")
-async def get_file_tree():
+async def get_file_tree(request: Request):
     """获取本地文件树结构"""
+    tree = PLAYER.local_file_tree
+    if _tree_cache["tree"] is not tree:
+        body = orjson.dumps({
+            "status": "OK",
+            "tree": tree
+        })
+        _tree_cache["body"] = body
+        _tree_cache["etag"] = _content_etag(body)
+        _tree_cache["tree"] = tree
+    etag = _tree_cache["etag"]
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return Response(
+        content=_tree_cache["body"],
+        media_type="application/json",
+        headers={"ETag": etag, "Vary": "Accept-Encoding"}
+    )
+
+# ============================================
+# 请求模型
+# ============================================
+
+async def _read_json(request: Request):
+    """读取并解析 JSON 请求体（orjson 直接解析原始字节，跳过 bytes→str 解码）"""
+    return orjson.loads(await request.body())
+
+class _InvalidBody(ValueError):
+    """请求体无法解析为参数对象（非法 JSON，或 JSON 数组、标量）"""
+
+
+def _invalid_body(exc: _InvalidBody) -> ORJSONResponse:
+    """请求体无效时的 400 响应"""
+    return ORJSONResponse({"status": "ERROR", "error": str(exc)}, status_code=400)
+
+
+async def _read_params(request: Request) -> dict:
+    """读取请求参数：默认按 JSON 解析（空请求体视为 {}），旧的表单提交走兼容分支
+
+    请求体不是 JSON 对象时抛出 _InvalidBody，由调用方返回 400
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+        return dict(await request.form())
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise _InvalidBody("请求体不是有效的 JSON") from e
+    if not isinstance(data, dict):
+        raise _InvalidBody("请求体必须是 JSON 对象")
+    return data
+
+
+class _StrippedReq(BaseModel):
+    """请求体基类：字符串字段在解析时统一去除首尾空白，处理函数中无需再 strip"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+
+class PlayReq(_StrippedReq):
+    """/play 请求体"""
+    url: str = ""
+    title: str = ""
+    type: str = "local"
+    duration: float = 0
+    stream_format: str = "mp3"
+
+
+class SearchReq(_StrippedReq):
+    """/search_song、/search_youtube 请求体"""
+    query: str = ""
+
+
+class SeekReq(BaseModel):
+    """/seek 请求体（百分比 0-100）"""
+    percent: float = 0
+
+
+class CreatePlaylistReq(_StrippedReq):
+    """/playlists、/playlist_create 请求体"""
+    name: str = "新歌单"
+
+
+class AddSongReq(BaseModel):
+    """/playlist_add 请求体"""
+    playlist_id: Optional[str] = None
+    song: Optional[dict] = None
+    insert_index: Optional[int] = None
+
+
+class ReorderReq(BaseModel):
+    """/playlist_reorder 请求体"""
+    playlist_id: Optional[str] = None
+    from_index: Optional[int] = None
+    to_index: Optional[int] = None
+
+# ============================================
+# 歌单条目规范化
+# ============================================
+
+# 歌曲种类：归类时只做一次字符串判断，之后按整数下标分发
+KIND_LOCAL = 0
+KIND_STREAM = 1
+
+def _song_kind(song_type: str, url: str) -> int:
+    """根据类型和 URL 判断歌曲种类"""
+    return KIND_STREAM if song_type == "youtube" or url.startswith(_HTTP_PREFIXES) else KIND_LOCAL
+
+class NormalizedSong(NamedTuple):
+    """歌单条目的规范化视图"""
+    url: str
+    title: str
+    type: str
+    duration: float
+    kind: int
+
+    @classmethod
+    def from_entry(cls, song_data: dict) -> "NormalizedSong":
+        """一次性完成类型归类和标题推断（旧版字符串条目已在歌单加载时转换为 dict）"""
+        url = song_data.get("url", "")
+        song_type = song_data.get("type", "local")
+        kind = _song_kind(song_type, url)
+        title = song_data.get("title")
+        if kind == KIND_STREAM:
+            song_type = "youtube"
+            title = title or url
+        else:
+            # 本地歌曲无标题时与 LocalSong 一致：取文件名（不含扩展名），而不是完整路径
+            title = title or LocalSong.title_from_path(url)
+        return cls(url, title, song_type, song_data.get("duration", 0), kind)
+
+    def to_song(self):
+        """构造可播放的 Song 对象"""
+        return _SONG_BUILDERS[self.kind](self)
+
+def _build_local_song(entry: NormalizedSong) -> LocalSong:
+    """构造本地歌曲对象（无标题时由 LocalSong 从文件名推断）"""
+    return LocalSong(file_path=entry.url, title=entry.title or None)
+
+def _build_stream_song(entry: NormalizedSong) -> StreamSong:
+    """构造串流歌曲对象"""
+    return StreamSong(stream_url=entry.url, title=entry.title or entry.url, duration=entry.duration)
+
+# 按 KIND_* 下标索引的 Song 构造函数
+_SONG_BUILDERS = (_build_local_song, _build_stream_song)
+
+def _song_payload(url: str, title: str = None, song_type: str = "local", duration: float = 0, thumbnail_url: str = None) -> dict:
+    """直接构造歌单条目字典（字段与 Song.to_dict() 一致，省去中间 Song 对象）"""
+    if not title:
+        title = "加载中…" if url.startswith("http") else os.path.basename(url)
     return {
-        "status": "OK",
-        "tree": PLAYER.local_file_tree
+        "url": url,
+        "title": title,
+        "name": title,
+        "type": song_type,
+        "duration": duration,
+        "ts": int(time.time()),
+        "thumbnail_url": thumbnail_url,
+        "artist": title,
     }
 
+def _build_plain_entry(song_data: dict) -> dict:
+    """构造本地/普通串流歌单条目（原样使用提交的缩略图）"""
+    return _song_payload(
+        url=song_data.get("url"),
+        title=song_data.get("title"),
+        song_type=song_data.get("type", "local"),
+        duration=song_data.get("duration", 0),
+        thumbnail_url=song_data.get("thumbnail_url")
+    )
+
+def _build_youtube_entry(song_data: dict) -> dict:
+    """构造 YouTube 歌单条目（缺少缩略图时从视频 ID 推导）"""
+    url = song_data.get("url", "")
+    thumbnail_url = song_data.get("thumbnail_url")
+    if not thumbnail_url:
+        video_id_match = _YT_ID_RE.search(url) if "youtu" in url else None
+        if video_id_match:
+            # 使用 sddefault 避免 404 错误
+            thumbnail_url = f"https://img.youtube.com/vi/{video_id_match.group(1)}/sddefault.jpg"
+    return _song_payload(
+        url=url,
+        title=song_data.get("title"),
+        song_type="youtube",
+        duration=song_data.get("duration", 0),
+        thumbnail_url=thumbnail_url
+    )
+
+# 按歌曲类型分派的歌单条目构造函数（未知类型按普通条目处理）
+_ENTRY_BUILDERS = {
+    "youtube": _build_youtube_entry,
+    "local": _build_plain_entry,
+}
+
 # ============================================
 # API 路由：播放控制
 # ============================================
 
+# 串行化播放器状态变更（/play、/next、/prev），保证并发切歌按到达顺序执行
+_PLAY_LOCK = asyncio.Lock()
+
 @app.post("/play")
-async def play(request: Request):
+async def play(req: PlayReq):
     """播放指定歌曲 - 服务器MPV播放 + 浏览器推流"""
     try:
-        form = await request.form()
-        url = form.get("url", "").strip()
-        title = form.get("title", "").strip()
-        song_type = form.get("type", "local").strip()
-        stream_format = form.get("stream_format", "mp3").strip() or "mp3"
-        duration = float(form.get("duration", "0") or "0")
+        url = req.url
+        title = req.title
+        song_type = req.type or "local"
+        stream_format = req.stream_format or "mp3"
+        duration = req.duration or 0
         
         # 🔍 详细调试日志 - 网络歌曲播放追踪
-        is_network_song = song_type == "youtube" or url.startswith("http")
+        kind = _song_kind(song_type, url)
+        is_network_song = kind == KIND_STREAM
         logger.info("=" * 60)
         logger.info(f"🎵 [/play] 接收到播放请求")
         logger.info(f"   📌 URL: {url}")
@@ -780,306 +1180,260 @@ async def play(request: Request):
         
         if not url:
             logger.error("[/play] ❌ URL为空")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "URL不能为空"},
                 status_code=400
             )
         
         # 创建Song对象
+        song = _SONG_BUILDERS[kind](NormalizedSong(url, title, song_type, duration, kind))
         if is_network_song:
-            logger.info(f"[/play] 🌐 创建 StreamSong 对象...")
-            song = StreamSong(stream_url=url, title=title or url, duration=duration)
             logger.info(f"[/play] ✓ StreamSong 已创建: video_id={song.video_id}, duration={song.duration}")
-        else:
-            song = LocalSong(file_path=url, title=title)
         
         # ✅【核心修改】播放逻辑：直接播放指定歌曲，不添加到队列
         # 如果用户想"添加到队列下一曲"，应该使用 /playlist_add 端点
         # 这样确保：1. 不打断当前播放  2. 新歌曲在下一曲位置  3. 前后台数据同步
-        PLAYER.play(
-            song,
-            mpv_command_func=PLAYER.mpv_command,
-            mpv_pipe_exists_func=PLAYER.mpv_pipe_exists,
-            ensure_mpv_func=PLAYER.ensure_mpv,
-            add_to_history_func=PLAYBACK_HISTORY.add_to_history,
-            save_to_history=True,
-            mpv_cmd=PLAYER.mpv_cmd
-        )
-        
+        # PLAYER.play 是阻塞调用（MPV IPC、yt-dlp、写历史），放到线程池执行；锁保证切歌顺序
+        async with _PLAY_LOCK:
+            success = await asyncio.to_thread(
+                PLAYER.play,
+                song,
+                mpv_command_func=PLAYER.mpv_command,
+                mpv_pipe_exists_func=PLAYER.mpv_pipe_exists,
+                ensure_mpv_func=PLAYER.ensure_mpv,
+                add_to_history_func=PLAYBACK_HISTORY.add_to_history,
+                save_to_history=True,
+                mpv_cmd=PLAYER.mpv_cmd
+            )
+            if not success:
+                logger.error(f"[播放] ❌ 播放失败: {title}")
+                return ORJSONResponse(
+                    {"status": "ERROR", "error": "播放失败"},
+                    status_code=500
+                )
+
+            # 更新 PLAYER.current_index：查找当前播放歌曲在列表中的索引
+            # （与播放在同一把锁内完成，并发的 /next 不会读到旧索引）
+            try:
+                playlist = CURRENT_PLAYLIST_REF
+                if playlist:
+                    for idx, song_item in enumerate(playlist.songs):
+                        if song_item.get("url") == url:
+                            PLAYER.current_index = idx
+                            logger.info(f"[播放] ✓ 已更新 current_index = {idx}, 歌曲: {title}")
+                            break
+            except Exception as e:
+                logger.warning(f"[播放] 更新 current_index 失败: {e}")
+            _invalidate_status()
+
         # 【状态改变显示】显示正在播放的歌曲信息
         logger.info(
             f"▶️ [播放状态改变] 正在播放: {title} (类型: {song_type})"
         )
-        
-        # 更新 PLAYER.current_index：查找当前播放歌曲在列表中的索引
-        try:
-            playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
-            if playlist:
-                for idx, song_item in enumerate(playlist.songs):
-                    song_item_url = song_item.get("url") if isinstance(song_item, dict) else str(song_item)
-                    if song_item_url == url:
-                        PLAYER.current_index = idx
-                        logger.info(f"[播放] ✓ 已更新 current_index = {idx}, 歌曲: {title}")
-                        break
-        except Exception as e:
-            logger.warning(f"[播放] 更新 current_index 失败: {e}")
-        
-        return {
+
+        return _no_store({
             "status": "OK",
             "message": "播放成功",
             "current": PLAYER.current_meta
-        }
+        })
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.error(f"[播放] 异常: {e}")
+        logger.debug("[播放] 异常堆栈", exc_info=True)
+        return _error(e)
+
+# 别名路由：直接注册同一个处理函数，不再经包装函数二次调用
+app.add_api_route("/play_song", play, methods=["POST"])
+
+# 切歌方向 → (日志标签, 路由名, 描述)
+_ADVANCE_LABELS = {
+    1: ("[自动播放]", "/next", "下一首"),
+    -1: ("[上一首]", "/prev", "上一首"),
+}
+
+async def _advance(direction: int):
+    """按方向切换到相邻歌曲并播放（direction: 1 下一首，-1 上一首，均循环）"""
+    tag, route, label = _ADVANCE_LABELS[direction]
+    async with _PLAY_LOCK:
+        try:
+            songs = CURRENT_SONGS
 
-@app.post("/play_song")
-async def play_song(request: Request):
-    """播放指定歌曲（别名）"""
-    return await play(request)
+            if not songs:
+                logger.error(f"[ERROR] {route}: 当前歌单为空")
+                return ORJSONResponse(
+                    {"status": "ERROR", "error": "当前歌单为空"},
+                    status_code=400
+                )
 
-@app.post("/next")
-async def next_track():
-    """播放下一首"""
-    try:
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
-        songs = playlist.songs if playlist else []
+            # 确定目标索引（取模实现循环播放）；未在播放时下一首从第一首开始，上一首从最后一首开始
+            current_idx = PLAYER.current_index if PLAYER.current_index >= 0 else (-1 if direction > 0 else 0)
+            target_idx = (current_idx + direction) % len(songs)
 
-        if not songs:
-            logger.error("[ERROR] /next: 当前歌单为空")
-            return JSONResponse(
-                {"status": "ERROR", "error": "当前歌单为空"},
-                status_code=400
-            )
+            logger.info(f"{tag} 从索引 {current_idx} 跳到 {target_idx}，总歌曲数：{len(songs)}")
 
-        # 确定下一首的索引（支持循环播放）
-        current_idx = PLAYER.current_index if PLAYER.current_index >= 0 else -1
-        next_idx = current_idx + 1 if current_idx >= 0 else 0
-        
-        # 循环播放：如果到达队列底部，返回到第一首
-        if next_idx >= len(songs):
-            next_idx = 0
-        
-        logger.info(f"[自动播放] 从索引 {current_idx} 跳到 {next_idx}，总歌曲数：{len(songs)}")
+            # 获取目标歌曲
+            song_data = songs[target_idx]
+            entry = NormalizedSong.from_entry(song_data)
 
-        # 获取下一首歌曲
-        song_data = songs[next_idx]
-        
-        # 处理歌曲数据（可能是dict或字符串路径）
-        if isinstance(song_data, dict):
-            url = song_data.get("url", "")
-            title = song_data.get("title", url)
-            song_type = song_data.get("type", "local")
-            duration = song_data.get("duration", 0)
-        else:
-            url = str(song_data)
-            title = os.path.basename(url)
-            song_type = "local"
-            duration = 0
+            if not entry.url:
+                logger.error(f"[ERROR] {route}: 歌曲数据不完整: {song_data}")
+                return ORJSONResponse(
+                    {"status": "ERROR", "error": "歌曲信息不完整"},
+                    status_code=400
+                )
 
-        if not url:
-            logger.error(f"[ERROR] /next: 歌曲数据不完整: {song_data}")
-            return JSONResponse(
-                {"status": "ERROR", "error": "歌曲信息不完整"},
-                status_code=400
+            # 构造Song对象并播放（标题以 LocalSong/StreamSong 推断的结果为准）
+            song = entry.to_song()
+            title = song.title
+            if entry.kind == KIND_STREAM:
+                logger.info(f"{tag} 播放YouTube: {title}")
+            else:
+                logger.info(f"{tag} 播放本地文件: {title}")
+
+            success = await asyncio.to_thread(
+                PLAYER.play,
+                song,
+                mpv_command_func=PLAYER.mpv_command,
+                mpv_pipe_exists_func=PLAYER.mpv_pipe_exists,
+                ensure_mpv_func=PLAYER.ensure_mpv,
+                add_to_history_func=PLAYBACK_HISTORY.add_to_history,
+                save_to_history=True
             )
 
-        # 构造Song对象并播放
-        if song_type == "youtube" or url.startswith("http"):
-            song = StreamSong(stream_url=url, title=title or url, duration=duration)
-            logger.info(f"[自动播放] 播放YouTube: {title}")
-        else:
-            song = LocalSong(file_path=url, title=title)
-            logger.info(f"[自动播放] 播放本地文件: {title}")
-
-        success = PLAYER.play(
-            song,
-            mpv_command_func=PLAYER.mpv_command,
-            mpv_pipe_exists_func=PLAYER.mpv_pipe_exists,
-            ensure_mpv_func=PLAYER.ensure_mpv,
-            add_to_history_func=PLAYBACK_HISTORY.add_to_history,
-            save_to_history=True
-        )
-        
-        if not success:
-            logger.error(f"[ERROR] /next: 播放失败")
-            return JSONResponse(
-                {"status": "ERROR", "error": "播放失败"},
-                status_code=500
-            )
-        
-        PLAYER.current_index = next_idx
-        logger.info(f"[自动播放] ✓ 已切换到下一首: {title}")
+            if not success:
+                logger.error(f"[ERROR] {route}: 播放失败")
+                return ORJSONResponse(
+                    {"status": "ERROR", "error": "播放失败"},
+                    status_code=500
+                )
 
-        return {
-            "status": "OK",
-            "current": PLAYER.current_meta,
-            "current_index": PLAYER.current_index,
-        }
-    except Exception as e:
-        import traceback
-        logger.error(f"[ERROR] /next 异常: {str(e)}")
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+            PLAYER.current_index = target_idx
+            _invalidate_status()
+            logger.info(f"{tag} ✓ 已切换到{label}: {title}")
+
+            return _no_store({
+                "status": "OK",
+                "current": PLAYER.current_meta,
+                "current_index": PLAYER.current_index,
+            })
+        except Exception as e:
+            logger.error(f"{tag} {route} 异常: {e}")
+            logger.debug(f"{tag} 异常堆栈", exc_info=True)
+            return _error(e)
+
+@app.post("/next")
+async def next_track():
+    """播放下一首"""
+    return await _advance(1)
 
 @app.post("/prev")
 async def prev_track():
     """播放上一首"""
-    try:
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
-        songs = playlist.songs if playlist else []
+    return await _advance(-1)
 
-        if not songs:
-            logger.error("[ERROR] /prev: 当前歌单为空")
-            return JSONResponse(
-                {"status": "ERROR", "error": "当前歌单为空"},
-                status_code=400
-            )
+# /status 需要的 MPV 属性，一次批量请求取回
+_MPV_STATUS_PROPS = ("pause", "time-pos", "duration", "volume")
 
-        # 确定上一首的索引（支持循环播放）
-        current_idx = PLAYER.current_index if PLAYER.current_index >= 0 else 0
-        prev_idx = current_idx - 1 if current_idx > 0 else len(songs) - 1
-        
-        # 循环播放：如果在第一首，则回到最后一首
-        if prev_idx < 0 or current_idx == 0:
-            prev_idx = len(songs) - 1
-        
-        logger.info(f"[上一首] 从索引 {current_idx} 跳到 {prev_idx}，总歌曲数：{len(songs)}")
+# /status 轮询得到的当前歌曲时长（按歌曲 URL 记录），/seek 直接复用，省去一次 IPC 往返
+_DURATION_CACHE = {"url": None, "duration": None}
 
-        # 获取上一首歌曲
-        song_data = songs[prev_idx]
-        
-        # 处理歌曲数据（可能是dict或字符串路径）
-        if isinstance(song_data, dict):
-            url = song_data.get("url", "")
-            title = song_data.get("title", url)
-            song_type = song_data.get("type", "local")
-            duration = song_data.get("duration", 0)
-        else:
-            url = str(song_data)
-            title = os.path.basename(url)
-            song_type = "local"
-            duration = 0
+def _current_url():
+    """当前播放歌曲的 URL（未播放时为 None）"""
+    return PLAYER.current_meta.get("url") if PLAYER.current_meta else None
 
-        if not url:
-            logger.error(f"[ERROR] /prev: 歌曲数据不完整: {song_data}")
-            return JSONResponse(
-                {"status": "ERROR", "error": "歌曲信息不完整"},
-                status_code=400
-            )
+# /status 响应缓存：多个标签页同时轮询时，短时间内共用一次 MPV 查询和序列化结果
+STATUS_CACHE_TTL = 0.2
+# generation：每次失效递增，查询期间发生失效时旧结果不写回缓存
+_status_cache = {"expires": 0.0, "body": None, "generation": 0}
+_STATUS_LOCK = asyncio.Lock()
 
-        # 构造Song对象并播放
-        if song_type == "youtube" or url.startswith("http"):
-            song = StreamSong(stream_url=url, title=title or url, duration=duration)
-            logger.info(f"[上一首] 播放YouTube: {title}")
-        else:
-            song = LocalSong(file_path=url, title=title)
-            logger.info(f"[上一首] 播放本地文件: {title}")
-
-        success = PLAYER.play(
-            song,
-            mpv_command_func=PLAYER.mpv_command,
-            mpv_pipe_exists_func=PLAYER.mpv_pipe_exists,
-            ensure_mpv_func=PLAYER.ensure_mpv,
-            add_to_history_func=PLAYBACK_HISTORY.add_to_history,
-            save_to_history=True
-        )
-        
-        if not success:
-            logger.error(f"[ERROR] /prev: 播放失败")
-            return JSONResponse(
-                {"status": "ERROR", "error": "播放失败"},
-                status_code=500
-            )
-        
-        PLAYER.current_index = prev_idx
-        logger.info(f"[上一首] ✓ 已切换到上一首: {title}")
+def _invalidate_status():
+    """播放状态被本进程修改后立即失效 /status 缓存，下一次轮询重新查询"""
+    _status_cache["expires"] = 0.0
+    _status_cache["generation"] += 1
 
-        return {
-            "status": "OK",
-            "current": PLAYER.current_meta,
-            "current_index": PLAYER.current_index,
+async def _build_status() -> dict:
+    """查询 MPV 并组装 /status 响应内容"""
+    playlist = CURRENT_PLAYLIST_REF
+    
+    # 获取 MPV 状态（安全地处理 MPV 不可用的情况）
+    mpv_state = {
+        "paused": True,
+        "time_pos": 0,
+        "duration": 0,
+        "volume": 50
+    }
+    
+    try:
+        values = await asyncio.to_thread(PLAYER.mpv_get_many, _MPV_STATUS_PROPS)
+        _DURATION_CACHE["url"] = _current_url()
+        _DURATION_CACHE["duration"] = values["duration"]
+        mpv_state = {
+            "paused": values["pause"],
+            "time_pos": values["time-pos"],
+            "duration": values["duration"],
+            "volume": values["volume"]
         }
     except Exception as e:
-        import traceback
-        logger.error(f"[ERROR] /prev 异常: {str(e)}")
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        # MPV 不可用时返回默认值
+        logger.debug(f"获取 MPV 状态失败 (MPV 可能未运行): {e}")
+    
+    # 为本地歌曲添加封面 URL（仅当封面存在时）
+    current_meta = dict(PLAYER.current_meta) if PLAYER.current_meta else {}
+    if current_meta.get("type") == "local" and not current_meta.get("thumbnail_url"):
+        url = current_meta.get("url", "")
+        if url:
+            # 先检查封面是否存在
+            if os.path.isabs(url):
+                abs_path = url
+            else:
+                abs_path = os.path.join(PLAYER.music_dir, url)
+            
+            # 检查内嵌封面或目录封面
+            has_cover = False
+            if os.path.isfile(abs_path):
+                # 检查目录封面
+                if _get_cover_from_directory(abs_path):
+                    has_cover = True
+                else:
+                    # 快速检查是否有内嵌封面（检查FFmpeg能否提取）
+                    cover_bytes = _extract_embedded_cover_bytes(abs_path)
+                    if cover_bytes:
+                        has_cover = True
+            
+            if has_cover:
+                from urllib.parse import quote
+                current_meta["thumbnail_url"] = f"/cover/{quote(url, safe='')}"
+    
+    return {
+        "status": "OK",
+        "current_meta": current_meta,
+        "current_playlist_id": CURRENT_PLAYLIST_ID,
+        "current_playlist_name": playlist.name if playlist else "--",
+        "loop_mode": PLAYER.loop_mode,
+        "mpv_state": mpv_state
+    }
 
 @app.get("/status")
 async def get_status():
     """获取播放器状态"""
     try:
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
-        
-        # 获取 MPV 状态（安全地处理 MPV 不可用的情况）
-        mpv_state = {
-            "paused": True,
-            "time_pos": 0,
-            "duration": 0,
-            "volume": 50
-        }
-        
-        try:
-            mpv_state = {
-                "paused": mpv_get("pause"),
-                "time_pos": mpv_get("time-pos"),
-                "duration": mpv_get("duration"),
-                "volume": mpv_get("volume")
-            }
-        except Exception as e:
-            # MPV 不可用时返回默认值
-            logger.debug(f"获取 MPV 状态失败 (MPV 可能未运行): {e}")
-        
-        # 为本地歌曲添加封面 URL（仅当封面存在时）
-        current_meta = dict(PLAYER.current_meta) if PLAYER.current_meta else {}
-        if current_meta.get("type") == "local" and not current_meta.get("thumbnail_url"):
-            url = current_meta.get("url", "")
-            if url:
-                # 先检查封面是否存在
-                if os.path.isabs(url):
-                    abs_path = url
-                else:
-                    abs_path = os.path.join(PLAYER.music_dir, url)
-                
-                # 检查内嵌封面或目录封面
-                has_cover = False
-                if os.path.isfile(abs_path):
-                    # 检查目录封面
-                    if _get_cover_from_directory(abs_path):
-                        has_cover = True
-                    else:
-                        # 快速检查是否有内嵌封面（检查FFmpeg能否提取）
-                        cover_bytes = _extract_embedded_cover_bytes(abs_path)
-                        if cover_bytes:
-                            has_cover = True
-                
-                if has_cover:
-                    from urllib.parse import quote
-                    current_meta["thumbnail_url"] = f"/cover/{quote(url, safe='')}"
-        
-        return {
-            "status": "OK",
-            "current_meta": current_meta,
-            "current_playlist_id": CURRENT_PLAYLIST_ID,
-            "current_playlist_name": playlist.name if playlist else "--",
-            "loop_mode": PLAYER.loop_mode,
-            "mpv_state": mpv_state
-        }
+        if _status_cache["body"] is not None and _status_cache["expires"] > time.monotonic():
+            return Response(content=_status_cache["body"], media_type="application/json")
+        async with _STATUS_LOCK:
+            # 等锁期间其他请求可能已刷新缓存
+            if _status_cache["body"] is None or _status_cache["expires"] <= time.monotonic():
+                generation = _status_cache["generation"]
+                body = orjson.dumps(await _build_status())
+                if _status_cache["generation"] != generation:
+                    # 查询期间状态已被修改：本次结果可能过时，只返回给当前请求
+                    return Response(content=body, media_type="application/json")
+                _status_cache["body"] = body
+                _status_cache["expires"] = time.monotonic() + STATUS_CACHE_TTL
+            return Response(content=_status_cache["body"], media_type="application/json")
     except Exception as e:
         # 捕获所有异常，防止 500 错误
         logger.error(f"获取播放器状态失败: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             {
                 "status": "ERROR",
                 "error": "获取播放器状态失败",
@@ -1101,11 +1455,18 @@ async def get_status():
 async def pause():
     """暂停/继续播放"""
     try:
-        paused = mpv_get("pause")
-        mpv_command(["set_property", "pause", not paused])
+        new_paused = await asyncio.to_thread(PLAYER.cycle_pause)
+        if new_paused is None:
+            # 批量读取未收到回复（如连接刚重建），单独再读一次切换后的状态
+            new_paused = await asyncio.to_thread(PLAYER.mpv_get, "pause")
+        _invalidate_status()
+        if new_paused is None:
+            return ORJSONResponse(
+                {"status": "ERROR", "error": "无法获取暂停状态"},
+                status_code=503
+            )
         
         # 【状态改变显示】暂停状态改变时显示
-        new_paused = not paused
         if PLAYER.current_meta and PLAYER.current_meta.get("url"):
             title = PLAYER.current_meta.get("title", "N/A")
             status_text = "⏸️ 暂停" if new_paused else "▶️ 播放中"
@@ -1113,54 +1474,51 @@ async def pause():
                 f"[播放状态改变] {status_text} | 歌曲: {title}"
             )
         
-        return {
+        return _no_store({
             "status": "OK",
-            "paused": not paused
-        }
+            "paused": new_paused
+        })
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
-@app.post("/toggle_pause")
-async def toggle_pause():
-    """暂停/继续播放（别名）"""
-    return await pause()
+# 别名路由
+app.add_api_route("/toggle_pause", pause, methods=["POST"])
 
 @app.post("/seek")
-async def seek(request: Request):
+async def seek(req: SeekReq):
     """跳转到指定位置"""
     try:
-        form = await request.form()
-        percent = float(form.get("percent", 0))
-        
         # 限制百分比范围
-        percent = max(0, min(100, percent))
+        percent = req.percent
+        percent = 0.0 if percent < 0.0 else 100.0 if percent > 100.0 else percent
         
         # ✅【修复】尝试使用百分比绝对寻址（更兼容，不需要先获取 duration）
         # 如果有 duration，计算具体位置；如果没有，直接用百分比寻址
-        duration = mpv_get("duration")
+        # 优先使用 /status 已取得的当前歌曲时长，仅在没有缓存时才向 MPV 查询
+        url = _current_url()
+        duration = _DURATION_CACHE["duration"] if url and _DURATION_CACHE["url"] == url else None
+        if not duration:
+            duration = await asyncio.to_thread(mpv_get, "duration")
         if duration and duration > 0:
             position = (percent / 100) * duration
-            mpv_command(["seek", position, "absolute"])
-            return {"status": "OK", "position": position}
+            await asyncio.to_thread(mpv_command, ["seek", position, "absolute"])
+            _invalidate_status()
+            return _no_store({"status": "OK", "position": position})
         else:
             # 没有 duration 时，用百分比进行寻址（更灵活）
             # MPV 会自动解析百分比值
-            mpv_command(["seek", percent, "absolute-percent"])
-            return {"status": "OK", "percent": percent}
+            await asyncio.to_thread(mpv_command, ["seek", percent, "absolute-percent"])
+            _invalidate_status()
+            return _no_store({"status": "OK", "percent": percent})
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/loop")
 async def set_loop_mode():
     """设置循环模式"""
     try:
         PLAYER.toggle_loop_mode()
+        _invalidate_status()
         
         # 【状态改变显示】循环模式改变时显示
         loop_modes = {
@@ -1173,80 +1531,161 @@ async def set_loop_mode():
             f"[播放状态改变] 循环模式: {mode_text}"
         )
         
-        return {
+        return _no_store({
             "status": "OK",
             "loop_mode": PLAYER.loop_mode
-        }
+        })
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 # ============================================
 # API 路由：搜索
 # ============================================
 
+# yt-dlp 结果缓存（搜索、URL 提取共用）：key -> (过期时间, 结果)，LRU 淘汰
+_YT_CACHE_MAX = 256
+_YT_CACHE_TTL = 300  # 秒
+_yt_cache = OrderedDict()
+
+
+def _yt_cache_get(key):
+    """读取未过期的缓存结果，未命中返回 None"""
+    cached = _yt_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        _yt_cache.move_to_end(key)
+        return cached[1]
+    return None
+
+
+def _yt_cache_put(key, value):
+    """写入缓存并按 LRU 淘汰超出容量的旧条目"""
+    _yt_cache[key] = (time.monotonic() + _YT_CACHE_TTL, value)
+    _yt_cache.move_to_end(key)
+    while len(_yt_cache) > _YT_CACHE_MAX:
+        _yt_cache.popitem(last=False)
+
+
+# 进行中的 yt-dlp 调用：key -> Task，相同请求并发到达时共享同一次执行
+_yt_inflight = {}
+
+
+def _yt_status_ok(result: dict) -> bool:
+    """yt-dlp 包装函数返回的结果是否成功"""
+    return result.get("status") == "OK"
+
+
+async def _yt_fetch(key, func, args, is_ok):
+    """在线程池执行 yt-dlp 调用，成功结果写入缓存，结束后移出进行中列表"""
+    try:
+        result = await asyncio.to_thread(func, *args)
+        if is_ok(result):
+            _yt_cache_put(key, result)
+        return result
+    finally:
+        _yt_inflight.pop(key, None)
+
+
+async def _yt_cached_call(key, is_ok, func, *args):
+    """缓存 + 合并并发请求：命中缓存直接返回，否则同一 key 只执行一次 func
+
+    等待方使用 shield，单个请求断开不会取消其他请求共享的执行。
+    """
+    result = _yt_cache_get(key)
+    if result is not None:
+        return result
+    task = _yt_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_yt_fetch(key, func, args, is_ok))
+        _yt_inflight[key] = task
+    return await asyncio.shield(task)
+
+
+async def _yt_search(query: str, max_results: int) -> dict:
+    """带缓存的 YouTube 搜索（yt-dlp 在线程池中执行，不阻塞事件循环）"""
+    return await _yt_cached_call(
+        ("search", query, max_results), _yt_status_ok, StreamSong.search, query, max_results
+    )
+
+
+async def _yt_extract_url(url: str) -> list:
+    """带缓存的 YouTube URL 提取（播放列表或单个视频）"""
+    return await _yt_cached_call(("url", url), bool, _extract_youtube_url, url)
+
+
+async def _yt_extract_playlist(url: str) -> dict:
+    """带缓存的 YouTube 播放列表提取"""
+    return await _yt_cached_call(("playlist", url), _yt_status_ok, StreamSong.extract_playlist, url)
+
+
+def _extract_youtube_url(url: str) -> list:
+    """提取 YouTube URL：播放列表或单个视频一次解析完成（阻塞，需在线程池调用）"""
+    result = StreamSong.extract_url(url)
+    if result.get("status") == "OK":
+        return result.get("entries", [])
+    return []
+
+
+async def _search_local_timed(query: str) -> list:
+    """本地搜索（线程池执行）并记录耗时"""
+    local_start = time.time()
+    results = await asyncio.to_thread(
+        PLAYER.search_local, query, max_results=PLAYER.local_search_max_results
+    )
+    logger.info(f"[搜索性能] 本地搜索耗时: {time.time() - local_start:.2f}秒，结果数: {len(results)}")
+    return results
+
+
+async def _search_youtube_timed(query: str) -> list:
+    """YouTube 搜索：URL 走提取，关键词走搜索，并记录耗时"""
+    yt_start = time.time()
+    if query.startswith(_HTTP_PREFIXES):
+        results = await _yt_extract_url(query)
+        logger.info(f"[搜索性能] YouTube URL 提取耗时: {time.time() - yt_start:.2f}秒，结果数: {len(results)}")
+    else:
+        yt_search_result = await _yt_search(query, PLAYER.youtube_search_max_results)
+        results = yt_search_result.get("results", []) if yt_search_result.get("status") == "OK" else []
+        logger.info(f"[搜索性能] YouTube 搜索耗时: {time.time() - yt_start:.2f}秒，结果数: {len(results)}")
+    return results
+
+
 @app.post("/search_song")
-async def search_song(request: Request):
+async def search_song(req: SearchReq):
     """搜索歌曲（本地 + YouTube）"""
     try:
-        import time as time_module  # 避免与内置time冲突
-        start_time = time_module.time()
+        start_time = time.time()
         
-        data = await request.json()
-        query = data.get("query", "").strip()
+        query = req.query
         
         if not query:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "搜索词不能为空"},
                 status_code=400
             )
         
         # 检查是否是 URL（YouTube 播放列表或视频）
-        is_url = query.startswith("http://") or query.startswith("https://")
+        is_url = query.startswith(_HTTP_PREFIXES)
         
         local_results = []
         youtube_results = []
         
         if is_url:
             # 如果是 URL，尝试提取播放列表或视频
-            yt_start = time_module.time()
             try:
-                # 先尝试作为播放列表处理
-                playlist_result = StreamSong.extract_playlist(query)
-                if playlist_result.get("status") == "OK":
-                    youtube_results = playlist_result.get("entries", [])
-                    # 如果播放列表为空，可能是单个视频，尝试作为视频处理
-                    if not youtube_results:
-                        video_result = StreamSong.extract_metadata(query)
-                        if video_result.get("status") == "OK":
-                            youtube_results = [video_result.get("data", {})]
-                else:
-                    # 如果不是播放列表，尝试作为单个视频处理
-                    video_result = StreamSong.extract_metadata(query)
-                    if video_result.get("status") == "OK":
-                        youtube_results = [video_result.get("data", {})]
-                logger.info(f"[搜索性能] YouTube URL 提取耗时: {time_module.time() - yt_start:.2f}秒，结果数: {len(youtube_results)}")
+                youtube_results = await _search_youtube_timed(query)
             except Exception as e:
                 logger.warning(f"[警告] 提取 YouTube URL 失败: {e}")
         else:
-            # 本地搜索
-            local_start = time_module.time()
-            local_results = PLAYER.search_local(query, max_results=PLAYER.local_search_max_results)
-            logger.info(f"[搜索性能] 本地搜索耗时: {time_module.time() - local_start:.2f}秒，结果数: {len(local_results)}")
-            
-            # YouTube 关键词搜索
-            yt_start = time_module.time()
-            try:
-                yt_search_result = StreamSong.search(query, max_results=PLAYER.youtube_search_max_results)
-                if yt_search_result.get("status") == "OK":
-                    youtube_results = yt_search_result.get("results", [])
-                logger.info(f"[搜索性能] YouTube 搜索耗时: {time_module.time() - yt_start:.2f}秒，结果数: {len(youtube_results)}")
-            except Exception as e:
-                logger.warning(f"[警告] YouTube搜索失败: {e}")
+            # 本地搜索和 YouTube 关键词搜索互不依赖，在线程池中并发执行
+            local_results, youtube_results = await asyncio.gather(
+                _search_local_timed(query), _search_youtube_timed(query), return_exceptions=True
+            )
+            if isinstance(local_results, Exception):
+                raise local_results
+            if isinstance(youtube_results, Exception):
+                logger.warning(f"[警告] YouTube搜索失败: {youtube_results}")
+                youtube_results = []
         
-        total_time = time_module.time() - start_time
+        total_time = time.time() - start_time
         logger.info(f"[搜索性能] ✅ 总搜索耗时: {total_time:.2f}秒")
         
         return {
@@ -1255,42 +1694,68 @@ async def search_song(request: Request):
             "youtube": youtube_results
         }
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
+        return _error(e)
+
+@app.post("/search_song/stream")
+async def search_song_stream(req: SearchReq):
+    """以 NDJSON 流式返回搜索结果（本地与 YouTube 谁先完成先输出，前端可先渲染本地结果）
+
+    每行形如 {"local": [...]} 或 {"youtube": [...]}，失败时该行附带 error 字段
+    """
+    query = req.query
+    if not query:
+        return ORJSONResponse(
+            {"status": "ERROR", "error": "搜索词不能为空"},
+            status_code=400
         )
 
+    async def _labeled(source, coro):
+        try:
+            return {source: await coro}
+        except Exception as e:
+            logger.warning(f"[警告] {source} 搜索失败: {e}")
+            return {source: [], "error": str(e)}
+
+    async def generate():
+        tasks = [_labeled("youtube", _search_youtube_timed(query))]
+        if not query.startswith(_HTTP_PREFIXES):
+            tasks.append(_labeled("local", _search_local_timed(query)))
+        for next_done in asyncio.as_completed(tasks):
+            yield orjson.dumps(await next_done) + b"\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
 @app.post("/search_youtube")
-async def search_youtube(request: Request):
+async def search_youtube(req: SearchReq):
     """搜索 YouTube 视频"""
     try:
-        form = await request.form()
-        query = form.get("query", "").strip()
+        query = req.query
         
         if not query:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "搜索词不能为空"},
                 status_code=400
             )
         
         # 使用 yt-dlp 搜索
         try:
-            results = StreamSong.search(query, max_results=10)
+            results = await _yt_search(query, 10)
             return {
                 "status": "OK",
                 "results": results
             }
         except Exception as e:
             logger.error(f"[错误] YouTube 搜索失败: {e}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": f"搜索失败: {str(e)}"},
                 status_code=500
             )
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 # ============================================
 # ✅ 新增：获取目录下的所有歌曲
@@ -1307,11 +1772,11 @@ async def get_directory_songs(request: Request):
       目录下所有歌曲的列表
     """
     try:
-        data = await request.json()
+        data = await _read_json(request)
         directory = data.get("directory", "").strip()
         
         if not directory:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "目录路径不能为空"},
                 status_code=400
             )
@@ -1321,13 +1786,13 @@ async def get_directory_songs(request: Request):
         abs_path = os.path.abspath(os.path.join(abs_root, directory))
         
         if not abs_path.startswith(abs_root):
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "无效的目录路径"},
                 status_code=400
             )
         
         if not os.path.isdir(abs_path):
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "目录不存在"},
                 status_code=404
             )
@@ -1363,40 +1828,70 @@ async def get_directory_songs(request: Request):
         }
     except Exception as e:
         logger.error(f"获取目录歌曲失败: {e}")
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 # ============================================
 # API 路由：歌单管理
 # ============================================
 
+# ETag 盐值：进程重启后版本号从头计数，混入启动时间避免命中旧进程的 ETag
+_ETAG_SALT = str(time.time()).encode()
+
+def _make_etag(*parts) -> str:
+    """根据数据版本信息生成弱 ETag"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8, key=_ETAG_SALT[:64])
+    return f'W/"{digest.hexdigest()}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """客户端 If-None-Match 是否与当前 ETag 一致"""
+    return request.headers.get("if-none-match") == etag
+
+def _not_modified(etag: str, cache_control: str = None) -> Response:
+    """304 响应（无响应体），带上与 200 响应相同的 ETag、Vary 和 Cache-Control"""
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+# /playlists 响应缓存：歌单数据版本号未变时直接返回已序列化的字节
+_playlists_cache = {"version": -1, "body": b"", "etag": ""}
+
 @app.get("/playlists")
-async def get_playlists():
+async def get_playlists(request: Request):
     """获取所有歌单"""
-    return {
-        "status": "OK",
-        "playlists": [
-            {
-                "id": pid,
-                "name": p.name,
-                "count": len(p.songs),
-                "songs": p.songs
-            }
-            for pid, p in PLAYLISTS_MANAGER._playlists.items()
-        ]
-    }
+    version = PLAYLISTS_MANAGER.version
+    if _playlists_cache["version"] != version:
+        _playlists_cache["body"] = orjson.dumps({
+            "status": "OK",
+            "playlists": [
+                {
+                    "id": pid,
+                    "name": p.name,
+                    "count": len(p.songs),
+                    "songs": p.songs
+                }
+                for pid, p in PLAYLISTS_MANAGER._playlists.items()
+            ]
+        })
+        _playlists_cache["etag"] = _make_etag("playlists", version)
+        _playlists_cache["version"] = version
+    etag = _playlists_cache["etag"]
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return Response(
+        content=_playlists_cache["body"],
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
 
 @app.post("/playlists")
-async def create_playlist_restful(request: Request):
+async def create_playlist_restful(req: CreatePlaylistReq):
     """创建新歌单 (RESTful API)"""
     try:
-        data = await request.json()
-        name = data.get("name", "新歌单").strip()
+        name = req.name
         
         if not name:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"error": "歌单名称不能为空"},
                 status_code=400
             )
@@ -1408,17 +1903,16 @@ async def create_playlist_restful(request: Request):
             "songs": []
         }
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             {"error": str(e)},
             status_code=500
         )
 
 @app.post("/playlist_create")
-async def create_playlist(request: Request):
+async def create_playlist(req: CreatePlaylistReq):
     """创建新歌单"""
     try:
-        data = await request.json()
-        name = data.get("name", "新歌单").strip()
+        name = req.name
         
         playlist = PLAYLISTS_MANAGER.create_playlist(name)
         return {
@@ -1427,13 +1921,10 @@ async def create_playlist(request: Request):
             "name": playlist.name
         }
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/playlist_add")
-async def add_to_playlist(request: Request):
+async def add_to_playlist(req: AddSongReq):
     """添加歌曲到歌单（支持指定插入位置）
     
     核心逻辑：
@@ -1442,20 +1933,19 @@ async def add_to_playlist(request: Request):
     3. 前后台数据同步（PLAYER.current_index 由 /play 更新）
     """
     try:
-        data = await request.json()
-        playlist_id = data.get("playlist_id", CURRENT_PLAYLIST_ID)
-        song_data = data.get("song")
-        insert_index = data.get("insert_index")  # 可选：指定插入位置
+        playlist_id = req.playlist_id or CURRENT_PLAYLIST_ID
+        song_data = req.song
+        insert_index = req.insert_index  # 可选：指定插入位置
         
         if not song_data:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "歌曲数据不能为空"},
                 status_code=400
             )
         
         playlist = PLAYLISTS_MANAGER.get_playlist(playlist_id)
         if not playlist:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "歌单不存在"},
                 status_code=404
             )
@@ -1465,7 +1955,7 @@ async def add_to_playlist(request: Request):
         for existing_song in playlist.songs:
             existing_url = existing_song.get("url", "")
             if existing_url and existing_url == song_url:
-                return JSONResponse(
+                return ORJSONResponse(
                     {"status": "ERROR", "error": "该歌曲已存在于当前播放序列", "duplicate": True},
                     status_code=409
                 )
@@ -1473,7 +1963,7 @@ async def add_to_playlist(request: Request):
         # 计算插入位置：不打断当前播放，新歌曲在下一曲位置
         if insert_index is None:
             # 获取当前播放歌曲的索引（由 /play 端点维护）
-            current_index = PLAYER.current_index if hasattr(PLAYER, 'current_index') else -1
+            current_index = PLAYER.current_index
             
             logger.info(f"[添加歌曲] 计算插入位置 - PLAYER.current_index: {current_index}, 歌单长度: {len(playlist.songs)}")
             
@@ -1485,37 +1975,15 @@ async def add_to_playlist(request: Request):
                 insert_index = 1 if playlist.songs else 0  # 第一首之后，或如果空列表则位置0
                 logger.info(f"[添加歌曲] 无当前播放歌曲或索引无效，使用默认位置: {insert_index}")
         
-        # 创建 Song 对象
+        # 按歌曲类型选择条目构造函数（YouTube 专属的缩略图推导不进入本地路径）
         song_type = song_data.get("type", "local")
-        thumbnail_url = song_data.get("thumbnail_url")
-        
-        # 如果是 YouTube 歌曲且没有缩略图，自动生成
-        if song_type == "youtube" and not thumbnail_url:
-            url = song_data.get("url", "")
-            if "youtube.com" in url or "youtu.be" in url:
-                # 提取视频 ID
-                import re
-                video_id_match = re.search(r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})', url)
-                if video_id_match:
-                    video_id = video_id_match.group(1)
-                    # 使用 sddefault 避免 404 错误
-                    thumbnail_url = f"https://img.youtube.com/vi/{video_id}/sddefault.jpg"
-        
-        song_obj = Song(
-            url=song_data.get("url"),
-            title=song_data.get("title"),
-            song_type=song_type,
-            duration=song_data.get("duration", 0),
-            thumbnail_url=thumbnail_url
-        )
-        
-        # 转换为字典格式后插入
-        song_dict = song_obj.to_dict()
+        song_dict = _ENTRY_BUILDERS.get(song_type, _build_plain_entry)(song_data)
         # 确保 insert_index 不超出范围
-        insert_index = max(0, min(insert_index, len(playlist.songs)))
+        song_count = len(playlist.songs)
+        insert_index = 0 if insert_index < 0 else song_count if insert_index > song_count else insert_index
         playlist.songs.insert(insert_index, song_dict)
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        PLAYLISTS_MANAGER.mark_dirty()
         
         logger.info(f"[添加歌曲] ✓ 已插入 - 歌单: {playlist_id}, 位置: {insert_index}, 歌曲: {song_data.get('title', 'N/A')}")
         
@@ -1525,12 +1993,8 @@ async def add_to_playlist(request: Request):
         }
     except Exception as e:
         logger.error(f"[ERROR] 添加歌曲失败: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.debug("[添加歌曲] 异常堆栈", exc_info=True)
+        return _error(e)
 
 @app.post("/playlists/{playlist_id}/add_next")
 async def add_song_to_playlist_next(playlist_id: str, request: Request):
@@ -1543,7 +2007,7 @@ async def add_song_to_playlist_next(playlist_id: str, request: Request):
         thumbnail_url = form_data.get('thumbnail_url', '')
         
         if not url or not title:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "URL 和标题不能为空"},
                 status_code=400
             )
@@ -1551,7 +2015,7 @@ async def add_song_to_playlist_next(playlist_id: str, request: Request):
         # 添加到歌单
         playlist = PLAYLISTS_MANAGER.get_playlist(playlist_id)
         if not playlist:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": f"歌单 {playlist_id} 不存在"},
                 status_code=404
             )
@@ -1560,24 +2024,22 @@ async def add_song_to_playlist_next(playlist_id: str, request: Request):
         for existing_song in playlist.songs:
             existing_url = existing_song.get("url", "")
             if existing_url and existing_url == url:
-                return JSONResponse(
+                return ORJSONResponse(
                     {"status": "ERROR", "error": "该歌曲已存在于当前播放序列", "duplicate": True},
                     status_code=409
                 )
         
         # 如果是 YouTube 歌曲且没有缩略图，自动生成
         if song_type == "youtube" and not thumbnail_url:
-            # 提取视频 ID
-            import re
-            video_id_match = re.search(r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})', url)
+            # 提取视频 ID（非 YouTube 链接直接跳过正则）
+            video_id_match = _YT_ID_RE.search(url) if "youtu" in url else None
             if video_id_match:
                 video_id = video_id_match.group(1)
                 # 使用 sddefault 避免 404 错误
                 thumbnail_url = f"https://img.youtube.com/vi/{video_id}/sddefault.jpg"
         
-        # 创建歌曲对象
-        from models.song import Song
-        song_obj = Song(
+        # 创建歌单条目
+        song_dict = _song_payload(
             url=url,
             title=title,
             song_type=song_type,
@@ -1586,7 +2048,7 @@ async def add_song_to_playlist_next(playlist_id: str, request: Request):
         )
         
         # 获取当前播放歌曲的索引（从歌单数据中获取）
-        current_index = playlist.current_playing_index if hasattr(playlist, 'current_playing_index') else -1
+        current_index = playlist.current_playing_index
         
         # 如果有当前播放的歌曲，则插入到下一个位置；否则插入到第一首之后
         if current_index >= 0 and current_index < len(playlist.songs):
@@ -1595,22 +2057,18 @@ async def add_song_to_playlist_next(playlist_id: str, request: Request):
             insert_index = 1 if playlist.songs else 0  # 第一首之后，或如果空列表则位置0
         
         # 在指定位置插入歌曲
-        song_dict = song_obj.to_dict()
         playlist.songs.insert(insert_index, song_dict)
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        PLAYLISTS_MANAGER.mark_dirty()
         
         return {
             "status": "OK",
             "message": f"已添加到下一曲"
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.error(f"[ERROR] 添加到下一曲失败: {str(e)}")
+        logger.debug("[添加歌曲] 异常堆栈", exc_info=True)
+        return _error(e)
 
 @app.post("/playlists/{playlist_id}/add_top")
 async def add_song_to_playlist_top(playlist_id: str, request: Request):
@@ -1623,7 +2081,7 @@ async def add_song_to_playlist_top(playlist_id: str, request: Request):
         thumbnail_url = form_data.get('thumbnail_url', '')
         
         if not url or not title:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "URL 和标题不能为空"},
                 status_code=400
             )
@@ -1641,36 +2099,48 @@ async def add_song_to_playlist_top(playlist_id: str, request: Request):
         # 添加到歌单顶部
         playlist = PLAYLISTS_MANAGER.get_playlist(playlist_id)
         if not playlist:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": f"歌单 {playlist_id} 不存在"},
                 status_code=404
             )
         
-        # 使用 add_song 方法添加歌曲
-        success = playlist.add_song(song_data)
-        
-        # 如果添加成功，重新排列使其在顶部
-        if success and len(playlist.songs) > 1:
-            # 将最后添加的歌曲移到顶部
-            playlist.songs.insert(0, playlist.songs.pop())
+        # add_song 本身即插入到顶部（并按 URL 去重），无需再调整位置
+        playlist.add_song(song_data)
         
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        PLAYLISTS_MANAGER.mark_dirty()
         
         return {
             "status": "OK",
             "message": "已添加到歌单顶部"
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.error(f"[ERROR] 添加到歌单顶部失败: {str(e)}")
+        logger.debug("[添加歌曲] 异常堆栈", exc_info=True)
+        return _error(e)
+
+def _song_views(song_items) -> list:
+    """把歌单条目转换为前端使用的歌曲字典
+
+    dict 条目补齐基本字段；字符串条目兼容旧数据格式
+    """
+    return [
+        {
+            "url": s.get("url"),
+            "title": s.get("title") or s.get("name") or s.get("url"),
+            "type": s.get("type", "local"),
+            "duration": s.get("duration", 0),
+            "thumbnail_url": s.get("thumbnail_url", ""),
+        }
+        for s in song_items
+    ]
+
+
+# /playlist 响应缓存：{歌单ID: (ETag, 已序列化的响应体)}
+_playlist_body_cache = {}
 
 @app.get("/playlist")
-async def get_current_playlist(playlist_id: str = None):
+async def get_current_playlist(request: Request, playlist_id: str = None):
     """获取指定歌单内容（用户隔离：每个浏览器独立选择歌单）
     
     参数:
@@ -1688,118 +2158,115 @@ async def get_current_playlist(playlist_id: str = None):
         if not playlist:
             playlist = PLAYLISTS_MANAGER.get_playlist(DEFAULT_PLAYLIST_ID)
             target_playlist_id = DEFAULT_PLAYLIST_ID
-        if playlist and hasattr(playlist, "songs"):
-            for s in playlist.songs:
-                if isinstance(s, dict):
-                    # 确保包含基本字段
-                    songs.append(
-                        {
-                            "url": s.get("url"),
-                            "title": s.get("title") or s.get("name") or s.get("url"),
-                            "type": s.get("type", "local"),
-                            "duration": s.get("duration", 0),
-                            "thumbnail_url": s.get("thumbnail_url", ""),
-                        }
-                    )
-                elif isinstance(s, str):
-                    # 兼容旧字符串列表
-                    songs.append(
-                        {
-                            "url": s,
-                            "title": os.path.basename(s),
-                            "type": "local",
-                        }
-                    )
-        else:
-            # 没有找到当前歌单，返回空列表
-            songs = []
-        
-        # 获取当前播放索引
-        current_index = -1
-        try:
-            current_index = PLAYER.current_index if hasattr(PLAYER, 'current_index') else -1
-        except:
-            pass
-        
-        # 获取歌单名称（使用已获取的 playlist 对象）
-        playlist_name = playlist.name if playlist else "--"
-        
-        return {
-            "status": "OK",
-            "playlist": songs,  # 前端期望的字段名是 playlist
-            "playlist_id": target_playlist_id,  # 返回实际使用的歌单ID
-            "playlist_name": playlist_name,  # 添加歌单名称
-            "current_index": current_index
-        }
-    except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
+
+        # 歌单内容和播放索引都未变化时返回 304
+        etag = _make_etag("playlist", target_playlist_id, PLAYLISTS_MANAGER.version, PLAYER.current_index)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+
+        # 同一 ETag 的响应体已序列化过则直接复用
+        cached = _playlist_body_cache.get(target_playlist_id)
+        if cached is None or cached[0] != etag:
+            if playlist:
+                songs = _song_views(playlist.songs)
+                playlist_name = playlist.name
+            else:
+                # 没有找到当前歌单，返回空列表
+                playlist_name = "--"
+            cached = (etag, orjson.dumps({
+                "status": "OK",
+                "playlist": songs,  # 前端期望的字段名是 playlist
+                "playlist_id": target_playlist_id,  # 返回实际使用的歌单ID
+                "playlist_name": playlist_name,  # 添加歌单名称
+                "current_index": PLAYER.current_index
+            }))
+            _playlist_body_cache[target_playlist_id] = cached
+
+        return Response(
+            content=cached[1],
+            media_type="application/json",
+            headers={"ETag": etag}
         )
+    except Exception as e:
+        return _error(e)
+
+# 音量读取缓存：轮询时短时间内直接返回上次从 MPV 读到（或刚设置）的值
+VOLUME_CACHE_TTL = 0.2
+_volume_cache = {"volume": None, "expires": 0.0}
 
 @app.post("/volume")
 async def set_volume(request: Request):
     """设置或获取音量"""
     try:
-        form = await request.form()
-        volume_str = form.get("value", "").strip()
+        data = await _read_params(request)
+        value = data.get("value")
+        volume_str = "" if value is None else str(value).strip()
         
         if volume_str:
             # 设置音量
             try:
                 volume = int(volume_str)
-                volume = max(0, min(100, volume))  # 限制在0-100
-                PLAYER.mpv_command(["set_property", "volume", volume])
-                return {
+                volume = 0 if volume < 0 else 100 if volume > 100 else volume  # 限制在0-100
+                await asyncio.to_thread(PLAYER.mpv_command, ["set_property", "volume", volume])
+                _invalidate_status()
+                _volume_cache["volume"] = volume
+                _volume_cache["expires"] = time.monotonic() + VOLUME_CACHE_TTL
+                return _no_store({
                     "status": "OK",
                     "volume": volume
-                }
+                })
             except ValueError as e:
-                return JSONResponse(
+                return ORJSONResponse(
                     {"status": "ERROR", "error": f"无效的音量值: {volume_str}"},
                     status_code=400
                 )
         else:
             # 获取当前音量
+            now = time.monotonic()
+            if _volume_cache["expires"] > now:
+                return _no_store({
+                    "status": "OK",
+                    "volume": _volume_cache["volume"]
+                })
             try:
-                current_volume = PLAYER.mpv_get("volume")
+                current_volume = await asyncio.to_thread(PLAYER.mpv_get, "volume")
                 if current_volume is None:
                     # MPV 未运行或未设置音量，返回本地默认值
                     local_volume = PLAYER.config.get("LOCAL_VOLUME", "50")
                     try:
-                        return {
+                        return _no_store({
                             "status": "OK",
                             "volume": int(local_volume)
-                        }
+                        })
                     except (ValueError, TypeError):
-                        return {
+                        return _no_store({
                             "status": "OK",
                             "volume": 50
-                        }
+                        })
                 # 确保返回整数
                 volume_value = int(float(current_volume))
-                return {
+                _volume_cache["volume"] = volume_value
+                _volume_cache["expires"] = now + VOLUME_CACHE_TTL
+                return _no_store({
                     "status": "OK",
                     "volume": volume_value
-                }
+                })
             except (ValueError, TypeError) as e:
                 logger.warning(f"[警告] 获取音量失败: {e}, 当前值: {current_volume}")
                 # 返回默认音量
-                return {
+                return _no_store({
                     "status": "OK",
                     "volume": 50
-                }
+                })
+    except _InvalidBody as e:
+        return _invalid_body(e)
     except Exception as e:
         logger.error(f"[错误] /volume 路由异常: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.debug("[音量] 异常堆栈", exc_info=True)
+        return _error(e)
 
 
-@app.get("/volume/defaults")
+@app.get("/volume/defaults", response_model=None)
 async def get_volume_defaults():
     """获取默认音量配置（从settings.ini）"""
     try:
@@ -1812,10 +2279,10 @@ async def get_volume_defaults():
         except (ValueError, TypeError):
             local_volume = 50
         
-        return {
+        return ORJSONResponse({
             "status": "OK",
             "local_volume": local_volume
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to get volume defaults: {e}")
         return {
@@ -1829,7 +2296,7 @@ async def delete_playlist(playlist_id: str):
     try:
         # 防止删除默认歌单
         if playlist_id == "default":
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "默认歌单不可删除"},
                 status_code=400
             )
@@ -1840,15 +2307,12 @@ async def delete_playlist(playlist_id: str):
                 "message": "删除成功"
             }
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "歌单不存在"},
                 status_code=404
             )
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/playlists/{playlist_id}/remove")
 async def remove_song_from_playlist(playlist_id: str, request: Request):
@@ -1861,7 +2325,7 @@ async def remove_song_from_playlist(playlist_id: str, request: Request):
         
         if index < 0:
             logger.error(f"[ERROR] 无效的索引: {index}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "无效的索引"},
                 status_code=400
             )
@@ -1869,7 +2333,7 @@ async def remove_song_from_playlist(playlist_id: str, request: Request):
         playlist = PLAYLISTS_MANAGER.get_playlist(playlist_id)
         if not playlist:
             logger.error(f"[ERROR] 找不到歌单: {playlist_id}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "找不到歌单"},
                 status_code=404
             )
@@ -1878,7 +2342,7 @@ async def remove_song_from_playlist(playlist_id: str, request: Request):
         
         if index >= len(playlist.songs):
             logger.error(f"[ERROR] 索引超出范围: {index} >= {len(playlist.songs)}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "索引超出范围"},
                 status_code=400
             )
@@ -1888,7 +2352,7 @@ async def remove_song_from_playlist(playlist_id: str, request: Request):
         
         playlist.songs.pop(index)
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        PLAYLISTS_MANAGER.mark_dirty()
         
         # ✅ 【修复】仅当删除的是当前播放歌单时，才更新 PLAYER.current_index
         if playlist_id == DEFAULT_PLAYLIST_ID:
@@ -1907,31 +2371,29 @@ async def remove_song_from_playlist(playlist_id: str, request: Request):
         else:
             logger.info(f"[SUCCESS] 从歌单 {playlist_id} 删除成功，剩余歌曲数: {len(playlist.songs)} (非默认歌单，不修改 PLAYER.current_index)")
         
-        return JSONResponse({"status": "OK", "message": "删除成功"})
+        return ORJSONResponse({"status": "OK", "message": "删除成功"})
         
     except Exception as e:
         logger.error(f"[EXCEPTION] remove_song_from_playlist error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.debug("[删除歌曲] 异常堆栈", exc_info=True)
+        return _error(e)
 
 @app.put("/playlists/{playlist_id}")
-async def update_playlist(playlist_id: str, data: dict):
+async def update_playlist(playlist_id: str, request: Request):
     """更新歌单信息（如名称）"""
     try:
+        data = await _read_json(request)
+        
         # 防止修改默认歌单
         if playlist_id == "default":
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "默认歌单不可修改"},
                 status_code=400
             )
         
         new_name = data.get('name', '').strip()
         if not new_name:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "歌单名称不能为空"},
                 status_code=400
             )
@@ -1943,15 +2405,17 @@ async def update_playlist(playlist_id: str, data: dict):
                 "data": {"name": new_name}
             }
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "歌单不存在"},
                 status_code=404
             )
-    except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
+    except orjson.JSONDecodeError:
+        return ORJSONResponse(
+            {"status": "ERROR", "error": "请求体不是有效的 JSON"},
+            status_code=400
         )
+    except Exception as e:
+        return _error(e)
 
 @app.post("/playlists/{playlist_id}/switch")
 async def switch_playlist(playlist_id: str):
@@ -1963,22 +2427,15 @@ async def switch_playlist(playlist_id: str):
         # 验证目标歌单是否存在
         playlist = PLAYLISTS_MANAGER.get_playlist(playlist_id)
         if not playlist:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"error": "歌单不存在"},
                 status_code=404
             )
         
-        # 返回歌单信息，不修改后端全局状态
-        return {
-            "status": "OK",
-            "playlist": {
-                "id": playlist.id,
-                "name": playlist.name,
-                "count": len(playlist.songs)
-            }
-        }
+        # 不修改后端全局状态；前端不读取响应内容，直接返回 204 空响应
+        return Response(status_code=204)
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             {"error": str(e)},
             status_code=500
         )
@@ -1990,66 +2447,59 @@ async def playlist_play(request: Request):
         form = await request.form()
         index = int(form.get("index", 0))
 
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
-        songs = playlist.songs if playlist else []
+        songs = CURRENT_SONGS
 
         if 0 <= index < len(songs):
-            song_data = songs[index]
-            # song_data 可能是 dict，也可能是字符串
-            if isinstance(song_data, dict):
-                url = song_data.get("url")
-                title = song_data.get("title") or url
-                song_type = song_data.get("type", "local")
-            else:
-                url = song_data
-                title = os.path.basename(url)
-                song_type = "local"
-
-            if song_type == "youtube" or (url and str(url).startswith("http")):
-                song = StreamSong(stream_url=url, title=title or url)
-            else:
-                song = LocalSong(file_path=url, title=title)
+            song = NormalizedSong.from_entry(songs[index]).to_song()
 
-            PLAYER.play(song, index=index)
-            return JSONResponse({"status": "OK", "message": "播放成功"})
+            # 播放涉及 MPV 启动和管道 IPC，放到线程池执行，避免阻塞事件循环
+            async with _PLAY_LOCK:
+                success = await asyncio.to_thread(
+                    PLAYER.play,
+                    song,
+                    mpv_command_func=PLAYER.mpv_command,
+                    mpv_pipe_exists_func=PLAYER.mpv_pipe_exists,
+                    ensure_mpv_func=PLAYER.ensure_mpv,
+                    add_to_history_func=PLAYBACK_HISTORY.add_to_history,
+                    save_to_history=True,
+                    mpv_cmd=PLAYER.mpv_cmd
+                )
+                if not success:
+                    return ORJSONResponse(
+                        {"status": "ERROR", "error": "播放失败"},
+                        status_code=500
+                    )
+                PLAYER.current_index = index
+                _invalidate_status()
+            return _no_store({"status": "OK", "message": "播放成功"})
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "索引超出范围"},
                 status_code=400
             )
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/playlist_reorder")
-async def playlist_reorder(request: Request):
+async def playlist_reorder(req: ReorderReq):
     """重新排序播放队列"""
     try:
-        data = await request.json()
-        from_index = data.get("from_index")
-        to_index = data.get("to_index")
-        playlist_id = data.get("playlist_id", CURRENT_PLAYLIST_ID)  # 支持指定歌单
+        from_index = req.from_index
+        to_index = req.to_index
+        playlist_id = req.playlist_id or CURRENT_PLAYLIST_ID  # 支持指定歌单
         
         if from_index is not None and to_index is not None:
             playlist = PLAYLISTS_MANAGER.get_playlist(playlist_id)
-            if playlist and 0 <= from_index < len(playlist.songs) and 0 <= to_index < len(playlist.songs):
-                song = playlist.songs.pop(from_index)
-                playlist.songs.insert(to_index, song)
-                playlist.updated_at = time.time()
-                PLAYLISTS_MANAGER.save()
-            return JSONResponse({"status": "OK", "message": "重新排序成功"})
+            if playlist and playlist.reorder(from_index, to_index):
+                PLAYLISTS_MANAGER.mark_dirty()
+            return ORJSONResponse({"status": "OK", "message": "重新排序成功"})
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "缺少参数"},
                 status_code=400
             )
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/playlist_remove")
 async def playlist_remove(request: Request):
@@ -2062,15 +2512,15 @@ async def playlist_remove(request: Request):
         
         if index < 0:
             logger.error(f"[ERROR] 无效的索引: {index}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "无效的索引"},
                 status_code=400
             )
         
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
+        playlist = CURRENT_PLAYLIST_REF
         if not playlist:
             logger.error(f"[ERROR] 找不到歌单: {CURRENT_PLAYLIST_ID}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "找不到歌单"},
                 status_code=404
             )
@@ -2079,7 +2529,7 @@ async def playlist_remove(request: Request):
         
         if index >= len(playlist.songs):
             logger.error(f"[ERROR] 索引超出范围: {index} >= {len(playlist.songs)}")
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "索引超出范围"},
                 status_code=400
             )
@@ -2089,7 +2539,7 @@ async def playlist_remove(request: Request):
         
         playlist.songs.pop(index)
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        PLAYLISTS_MANAGER.mark_dirty()
         
         # ✅ 【修复】删除歌曲后更新 PLAYER.current_index，维护队列不变量
         logger.info(f"[删除验证] 删除前 current_index={PLAYER.current_index}, 被删索引={index}, 歌单长度={len(playlist.songs)}")
@@ -2103,39 +2553,31 @@ async def playlist_remove(request: Request):
             logger.info(f"[删除验证] ✓ 调整 current_index 到 {PLAYER.current_index}（删除了前面的歌曲）")
         # 如果 index > PLAYER.current_index，无需变化
         logger.info(f"[SUCCESS] 删除成功，剩余歌曲数: {len(playlist.songs)}, 调整后 current_index={PLAYER.current_index}")
-        return JSONResponse({"status": "OK", "message": "删除成功"})
+        return ORJSONResponse({"status": "OK", "message": "删除成功"})
         
     except Exception as e:
-        logger.info(f"[EXCEPTION] playlist_remove error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        logger.error(f"[EXCEPTION] playlist_remove error: {type(e).__name__}: {str(e)}")
+        logger.debug("[删除歌曲] 异常堆栈", exc_info=True)
+        return _error(e)
 
 @app.post("/playlist_clear")
 async def playlist_clear():
     """清空播放队列"""
     try:
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
+        playlist = CURRENT_PLAYLIST_REF
         if playlist:
-            playlist.songs = []
-            playlist.updated_at = time.time()
-            PLAYLISTS_MANAGER.save()
+            playlist.clear()
+            PLAYLISTS_MANAGER.mark_dirty()
             
             # ✅ 【修复】清空队列时重置 PLAYER.current_index
             PLAYER.current_index = -1
             logger.info(f"[清空队列] 队列已清空，重置 PLAYER.current_index = -1")
         
-        return JSONResponse({"status": "OK", "message": "清空成功"})
+        return Response(status_code=204)
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
-@app.get("/diagnostic/ytdlp")
+@app.get("/diagnostic/ytdlp", response_model=None)
 async def diagnostic_ytdlp():
     """诊断 yt-dlp 配置状态（用于排查网络歌曲播放问题）"""
     try:
@@ -2167,29 +2609,29 @@ async def diagnostic_ytdlp():
                 result["test_error"] = str(e)
                 result["working"] = False
         
-        return result
+        return ORJSONResponse(result)
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.get("/playback_history")
-async def get_playback_history():
+async def get_playback_history(request: Request):
     """获取播放历史"""
     try:
+        etag = _make_etag("history", PLAYER.playback_history.version)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
         history = PLAYER.playback_history.get_all()
-        return {
-            "status": "OK",
-            "history": history
-        }
-    except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
+        return ORJSONResponse(
+            {
+                "status": "OK",
+                "history": history
+            },
+            headers={"ETag": etag}
         )
+    except Exception as e:
+        return _error(e)
 
-@app.get("/playback_history_merged")
+@app.get("/playback_history_merged", response_model=None)
 async def get_playback_history_merged():
     """获取已合并的播放历史 - 相同URL只显示一次，最后播放时间降序排列"""
     try:
@@ -2214,28 +2656,38 @@ async def get_playback_history_merged():
         merged_history = list(merged_dict.values())
         merged_history.sort(key=lambda x: x.get('ts', 0), reverse=True)
         
-        return {
+        return ORJSONResponse({
             "status": "OK",
             "history": merged_history,
             "count": len(merged_history)
-        }
+        })
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
+
+# 同一客户端在该时间窗口（秒）内重复提交同一 URL 的播放历史时直接忽略（如拖动进度条触发的重复上报）
+HISTORY_DEDUP_WINDOW = 5.0
+# (客户端地址, url) -> 最近一次记录的时间；不同客户端、不同歌曲互不影响
+_recent_history = {}
+
+def _is_duplicate_history(client: str, url: str) -> bool:
+    """判断是否为窗口内的重复上报，否则记录本次提交时间"""
+    now = time.monotonic()
+    key = (client, url)
+    last = _recent_history.get(key)
+    if last is not None and now - last < HISTORY_DEDUP_WINDOW:
+        return True
+    if len(_recent_history) >= 256:
+        # 清理过期记录，避免长期运行时无限增长
+        for k in [k for k, ts in _recent_history.items() if now - ts >= HISTORY_DEDUP_WINDOW]:
+            del _recent_history[k]
+    _recent_history[key] = now
+    return False
 
 @app.post("/song_add_to_history")
 async def song_add_to_history(request: Request):
     """新增一条播放历史记录（替代 /play_queue_add_to_history）"""
     try:
-        payload = {}
-        content_type = (request.headers.get("content-type") or "").lower()
-        if "application/json" in content_type:
-            payload = await request.json()
-        else:
-            form = await request.form()
-            payload = {k: v for k, v in form.items()}
+        payload = await _read_params(request)
 
         url = (payload.get("url") or "").strip()
         title = (payload.get("title") or url).strip()
@@ -2243,11 +2695,15 @@ async def song_add_to_history(request: Request):
         thumbnail_url = (payload.get("thumbnail_url") or "").strip() or None
 
         if not url:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "url不能为空"},
                 status_code=400
             )
 
+        client = request.client.host if request.client else ""
+        if _is_duplicate_history(client, url):
+            return {"status": "OK", "message": "已添加到播放历史", "dedup": True}
+
         is_local = song_type != "youtube"
         PLAYER.playback_history.add_to_history(
             url,
@@ -2257,11 +2713,10 @@ async def song_add_to_history(request: Request):
         )
 
         return {"status": "OK", "message": "已添加到播放历史"}
+    except _InvalidBody as e:
+        return _invalid_body(e)
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/youtube_extract_playlist")
 async def youtube_extract_playlist(request: Request):
@@ -2271,64 +2726,58 @@ async def youtube_extract_playlist(request: Request):
         url = form.get("url", "").strip()
         
         if not url:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "URL不能为空"},
                 status_code=400
             )
         
         # 使用StreamSong提取播放列表
-        videos = StreamSong.extract_playlist(url)
+        videos = await _yt_extract_playlist(url)
         return {
             "status": "OK",
             "videos": videos
         }
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 @app.post("/play_youtube_playlist")
 async def play_youtube_playlist(request: Request):
     """播放YouTube播放列表"""
     try:
-        data = await request.json()
+        data = await _read_json(request)
         videos = data.get("videos", [])
         
         if not videos:
-            return JSONResponse(
+            return ORJSONResponse(
                 {"status": "ERROR", "error": "播放列表为空"},
                 status_code=400
             )
         
-        playlist = PLAYLISTS_MANAGER.get_playlist(CURRENT_PLAYLIST_ID)
+        playlist = CURRENT_PLAYLIST_REF
         if not playlist:
             playlist = PLAYLISTS_MANAGER.get_playlist(DEFAULT_PLAYLIST_ID)
 
-        # 添加所有视频到当前歌单
-        for video in videos:
-            playlist.songs.append(
-                {
-                    "url": video.get("url"),
-                    "title": video.get("title", ""),
-                    "type": "youtube",
-                    "duration": video.get("duration", 0),
-                    "thumbnail_url": video.get("thumbnail_url", ""),
-                }
-            )
+        # 添加所有视频到当前歌单（一次 extend 批量追加）
+        playlist.songs.extend(
+            {
+                "url": video.get("url"),
+                "title": video.get("title", ""),
+                "type": "youtube",
+                "duration": video.get("duration", 0),
+                "thumbnail_url": video.get("thumbnail_url", ""),
+            }
+            for video in videos
+        )
 
         playlist.updated_at = time.time()
-        PLAYLISTS_MANAGER.save()
+        PLAYLISTS_MANAGER.mark_dirty()
         
         return {
             "status": "OK",
             "added": len(videos)
         }
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
 
 # ============================================
 # MPV 包装函数（便捷调用）
@@ -2346,144 +2795,151 @@ def mpv_get(property_name):
 # API 路由：用户设置
 # ============================================
 
+# 默认设置（实际存储由浏览器 localStorage 管理）
+DEFAULT_SETTINGS = {
+    "theme": "dark",
+    "language": "auto"
+}
+DEFAULT_SETTING_KEYS = frozenset(DEFAULT_SETTINGS)
+
+# 默认设置及重置设置的响应内容固定不变，启动时预先序列化
+DEFAULT_SETTINGS_RESPONSE_JSON = orjson.dumps({
+    "status": "OK",
+    "data": DEFAULT_SETTINGS
+})
+DEFAULT_SETTINGS_JSON = orjson.dumps({
+    "status": "OK",
+    "message": "已重置为默认设置（请清空 localStorage 重新加载）",
+    "data": DEFAULT_SETTINGS
+})
+
 @app.get("/settings")
 async def get_user_settings():
     """获取默认设置（用户设置由浏览器 localStorage 管理）"""
-    try:
-        return {
-            "status": "OK",
-            "data": {
-                "theme": "dark",
-                "language": "auto"
-            }
-        }
-    except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+    return Response(content=DEFAULT_SETTINGS_RESPONSE_JSON, media_type="application/json")
 
 @app.post("/settings")
 async def update_user_settings(request: Request):
     """设置已由浏览器 localStorage 管理，此接口仅返回成功响应"""
     try:
-        data = await request.json()
+        data = await _read_json(request)
         logger.info(f"[设置] 浏览器端发送的设置: {data}（已由客户端保存到 localStorage）")
         
-        return {
+        return _no_store({
             "status": "OK",
             "message": "设置已保存到浏览器本地存储",
             "data": data
-        }
+        })
     except Exception as e:
         logger.error(f"[设置] 处理失败: {e}")
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+        return _error(e)
+
+# 必须在 /settings/{key} 之前注册，否则 "reset" 会被当作设置项名称匹配
+@app.post("/settings/reset")
+async def reset_settings():
+    """重置设置为默认值（浏览器 localStorage）"""
+    logger.info("[API] 重置设置请求（浏览器 localStorage）")
+    return Response(content=DEFAULT_SETTINGS_JSON, media_type="application/json", headers=_NO_STORE_HEADERS)
 
 @app.post("/settings/{key}")
 async def update_single_setting(key: str, request: Request):
     """更新单个设置（由浏览器 localStorage 管理）"""
     try:
-        data = await request.json()
+        data = await _read_json(request)
         value = data.get("value")
         
         # 验证设置项（仅用于验证，实际存储由浏览器处理）
-        default_settings = {
-            "theme": "dark",
-            "language": "auto"
-        }
-        
-        if key not in default_settings:
-            return JSONResponse(
+        if key not in DEFAULT_SETTING_KEYS:
+            return ORJSONResponse(
                 {"status": "ERROR", "error": f"未知的设置项: {key}"},
                 status_code=400
             )
         
         logger.info(f"[设置] 客户端更新 {key} = {value}（已保存到localStorage）")
         
-        return {
+        return _no_store({
             "status": "OK",
             "message": f"已更新 {key}（客户端存储）",
             "data": {key: value}
-        }
+        })
     except Exception as e:
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
-
-@app.post("/settings/reset")
-async def reset_settings():
-    """重置设置为默认值（浏览器 localStorage）"""
-    try:
-        logger.info("[API] 重置设置请求（浏览器 localStorage）")
-        
-        default_settings = {
-            "theme": "dark",
-            "language": "auto"
-        }
-        
-        response_data = {
-            "status": "OK",
-            "message": "已重置为默认设置（请清空 localStorage 重新加载）",
-            "data": default_settings
+        return _error(e)
+
+# 设置项描述为静态内容：启动时序列化一次，并用内容哈希作为 ETag
+SETTINGS_SCHEMA_JSON = orjson.dumps({
+    "status": "OK",
+    "schema": {
+        "theme": {
+            "type": "select",
+            "label": "主题样式",
+            "options": [
+                {"value": "light", "label": "浅色"},
+                {"value": "dark", "label": "深色"},
+                {"value": "auto", "label": "自动"}
+            ],
+            "default": "dark"
+        },
+        "language": {
+            "type": "select",
+            "label": "语言",
+            "options": [
+                {"value": "auto", "label": "自动选择"},
+                {"value": "zh", "label": "中文"},
+                {"value": "en", "label": "English"}
+            ],
+            "default": "auto"
         }
-        
-        return JSONResponse(response_data, status_code=200)
-        
-    except Exception as e:
-        logger.exception(f"[API] 重置设置异常: {e}")
-        return JSONResponse(
-            {"status": "ERROR", "error": str(e)},
-            status_code=500
-        )
+    }
+})
+SETTINGS_SCHEMA_ETAG = _content_etag(SETTINGS_SCHEMA_JSON)
+SETTINGS_SCHEMA_CACHE_CONTROL = "public, max-age=3600"
+SETTINGS_SCHEMA_HEADERS = {
+    "ETag": SETTINGS_SCHEMA_ETAG,
+    "Cache-Control": SETTINGS_SCHEMA_CACHE_CONTROL,
+    "Vary": "Accept-Encoding",
+}
 
 @app.get("/settings/schema")
-async def get_settings_schema():
+async def get_settings_schema(request: Request):
     """获取设置项的描述和可选值"""
-    return {
-        "status": "OK",
-        "schema": {
-            "theme": {
-                "type": "select",
-                "label": "主题样式",
-                "options": [
-                    {"value": "light", "label": "浅色"},
-                    {"value": "dark", "label": "深色"},
-                    {"value": "auto", "label": "自动"}
-                ],
-                "default": "dark"
-            },
-            "language": {
-                "type": "select",
-                "label": "语言",
-                "options": [
-                    {"value": "auto", "label": "自动选择"},
-                    {"value": "zh", "label": "中文"},
-                    {"value": "en", "label": "English"}
-                ],
-                "default": "auto"
-            }
-        }
-    }
+    if _etag_matches(request, SETTINGS_SCHEMA_ETAG):
+        return _not_modified(SETTINGS_SCHEMA_ETAG, SETTINGS_SCHEMA_CACHE_CONTROL)
+    return Response(
+        content=SETTINGS_SCHEMA_JSON,
+        media_type="application/json",
+        headers=SETTINGS_SCHEMA_HEADERS
+    )
 
 
 # ============================================
 # 错误处理
 # ============================================
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """请求体校验失败：保持与其他接口一致的错误格式"""
+    errors = exc.errors()
+    first = errors[0] if errors else {}
+    field = ".".join(str(loc) for loc in first.get("loc", ()) if loc != "body")
+    return ORJSONResponse(
+        {"status": "ERROR", "error": f"请求参数无效: {field} {first.get('msg', '')}".strip()},
+        status_code=400
+    )
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """HTTP 异常（404、405 及接口主动抛出的 HTTPException）：保持与其他接口一致的错误格式"""
+    return ORJSONResponse(
+        {"status": "ERROR", "error": exc.detail},
+        status_code=exc.status_code,
+        headers=getattr(exc, "headers", None)
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    """全局异常处理器"""
-    return JSONResponse(
-        {
-            "status": "ERROR",
-            "error": str(exc)
-        },
-        status_code=500
-    )
+    """全局异常处理器（HTTPException 由上面的处理器处理，不会到达这里）"""
+    logger.exception(f"[异常] {request.method} {request.url.path} 未处理的异常")
+    return _error(exc)
 
 if __name__ == "__main__":
     import uvicorn
@@ -2500,4 +2956,27 @@ if __name__ == "__main__":
     # 应用过滤器到 uvicorn 访问日志
     logging.getLogger("uvicorn.access").addFilter(EndpointFilter())
     
-    uvicorn.run(app, host="0.0.0.0", port=80, access_log=False)
+    # 显式选择事件循环和 HTTP 解析器：uvloop（Windows 不支持）和 httptools 可用时优先使用，
+    # 显式导入也便于 PyInstaller 打包时发现这两个模块
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "h11"
+    logger.info(f"事件循环: {loop_impl}，HTTP 解析器: {http_impl}")
+
+    # 播放器、MPV 进程和歌单都是进程内单例，只能单 worker 运行
+    # （多 worker 会各自启动 MPV 并同时写歌单文件）
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=80,
+        loop=loop_impl,
+        http=http_impl,
+        access_log=False,
+    )
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 """日志配置模块 - 为整个应用提供统一的 logger"""
 
+import atexit
 import logging
+import queue
 import sys
 import os
 import configparser
+from logging.handlers import QueueHandler, QueueListener
 
 # ==================== 日志颜色常量 ====================
 
@@ -140,6 +143,33 @@ def load_logging_config():
 _LOGGING_CONFIG = load_logging_config()
 
 
+# ==================== 后台日志输出 ====================
+# 调用方只把日志记录放入队列，由后台监听线程统一写控制台，
+# 控制台/管道写入慢时不会阻塞请求处理和事件循环
+
+# QueueHandler -> 负责实际输出的 QueueListener
+_LISTENERS = {}
+
+
+def _enqueue_handler(handler: logging.Handler) -> QueueHandler:
+    """将处理器放到后台线程输出，返回供 logger 挂载的 QueueHandler"""
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(handler.level)
+    _LISTENERS[queue_handler] = listener
+    return queue_handler
+
+
+@atexit.register
+def _stop_listeners():
+    """退出前停止后台监听线程，确保队列中的日志全部输出"""
+    for listener in _LISTENERS.values():
+        listener.stop()
+    _LISTENERS.clear()
+
+
 # ==================== 模块级别 Logger ====================
 
 def _setup_module_logger():
@@ -160,8 +190,8 @@ def _setup_module_logger():
     formatter = ColoredFormatter()
     handler.setFormatter(formatter)
     
-    # 添加处理器
-    logger.addHandler(handler)
+    # 添加处理器（经队列由后台线程输出）
+    logger.addHandler(_enqueue_handler(handler))
     
     # 防止日志向上传播
     logger.propagate = False
@@ -216,9 +246,12 @@ def setup_logging(debug=None):
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     
-    # 清除已有的处理器
+    # 清除已有的处理器（同时停止其后台输出线程）
     for handler in list(root_logger.handlers):
         root_logger.removeHandler(handler)
+        listener = _LISTENERS.pop(handler, None)
+        if listener is not None:
+            listener.stop()
     
     # 创建控制台处理器
     handler = logging.StreamHandler(sys.stdout)
@@ -233,7 +266,7 @@ def setup_logging(debug=None):
         filtered_paths=_LOGGING_CONFIG['filtered_paths'],
         sample_rate=_LOGGING_CONFIG['polling_sample_rate']
     ))
-    root_logger.addHandler(handler)
+    root_logger.addHandler(_enqueue_handler(handler))
     
     return logger
 
@@ -21,10 +21,55 @@ import configparser
 import subprocess
 import re
 import logging
+import traceback
+import orjson
 from models import Song, LocalSong, StreamSong, Playlist, PlayHistory
 
+if os.name == "nt":
+    import msvcrt
+    import _winapi
+else:
+    import select
+
 logger = logging.getLogger(__name__)
 
+# 匹配 mpv 命令行中的 --audio-device 参数
+_AUDIO_DEVICE_ARG_RE = re.compile(r'\s*--audio-device=[^\s]+')
+
+# 参数固定的 MPV 命令：启动时预先编码为 IPC 帧，发送时免去 json.dumps
+_MPV_STATIC_FRAMES = {
+    tuple(cmd): (json.dumps({"command": cmd}) + "\n").encode("utf-8")
+    for cmd in (
+        ["stop"],
+        ["cycle", "pause"],
+        ["set_property", "ytdl-format", "bestaudio"],
+    )
+}
+
+# 持久 IPC 连接建立后发送：关闭该连接上的事件推送（事件由独立的监听线程读取）
+_MPV_DISABLE_EVENTS_FRAME = (json.dumps({"command": ["disable_event", "all"]}) + "\n").encode("utf-8")
+
+# 等待单行 MPV IPC 回复的最长时间（秒）：超时即放弃该连接，一次卡住的回复不会拖住所有调用方
+_MPV_IPC_REPLY_TIMEOUT = 2.0
+
+
+def _ipc_wait_readable(f, timeout: float) -> bool:
+    """等待 IPC 连接上有数据可读，超时返回 False（timeout 为 0 时只检查不等待）"""
+    if os.name != "nt":
+        return bool(select.select([f], [], [], timeout)[0])
+    # Windows 命名管道不支持 select：用 PeekNamedPipe 轮询可读字节数
+    handle = msvcrt.get_osfhandle(f.fileno())
+    deadline = time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        if _winapi.PeekNamedPipe(handle)[0] > 0:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.01)
+
 
 class MusicPlayer:
     """音乐播放器类 - 包含所有播放器配置和状态"""
@@ -189,6 +234,8 @@ class MusicPlayer:
         # 规范化 MPV 命令中的相对路径
         self.mpv_cmd = MusicPlayer._normalize_mpv_cmd(self.mpv_cmd)
         self.data_dir = data_dir
+        # 运行时选择的音频设备（由启动器在创建播放器前写入环境变量，进程内不再变化）
+        self.runtime_audio_device = os.environ.get("MPV_AUDIO_DEVICE", "")
         
         # 向后兼容性：提供 flask_host 和 flask_port 别名（已弃用）
         self.flask_host = server_host
@@ -243,6 +290,14 @@ class MusicPlayer:
 
         # 线程锁
         self._lock = threading.RLock()
+        self._mpv_start_lock = threading.Lock()
+
+        # 持久 MPV IPC 连接（命令与属性查询共用，按 request_id 匹配响应）
+        self._ipc = None
+        self._ipc_pipe_name = None
+        self._ipc_lock = threading.Lock()
+        self._ipc_unread = 0  # 已发送但尚未读走的回复行数（含不等待回复的命令）
+        self._req_id_lock = threading.Lock()
 
         # 加载持久化数据
         self.load_playback_history()
@@ -602,7 +657,6 @@ class MusicPlayer:
 
     def load_current_playlist(self):
         """从文件加载当前播放列表"""
-        import traceback
         try:
             if os.path.exists(self.current_playlist_file):
                 with open(self.current_playlist_file, "r", encoding="utf-8") as f:
@@ -754,7 +808,8 @@ class MusicPlayer:
                 # 找到了匹配的歌曲，删除它
                 removed_song = default_playlist.songs.pop(removed_index)
                 default_playlist.updated_at = time.time()
-                app.PLAYLISTS_MANAGER.save()
+                # 事件线程中只标记脏数据，由事件循环上的自动保存任务写盘
+                app.PLAYLISTS_MANAGER.mark_dirty()
                 
                 song_title = removed_song.get('title') if isinstance(removed_song, dict) else str(removed_song)
                 logger.info(f"[自动播放] ✓ 已删除播放完毕的歌曲 (索引{removed_index}): {song_title}")
@@ -764,7 +819,7 @@ class MusicPlayer:
                 if len(default_playlist.songs) > 0:
                     removed_song = default_playlist.songs.pop(0)
                     default_playlist.updated_at = time.time()
-                    app.PLAYLISTS_MANAGER.save()
+                    app.PLAYLISTS_MANAGER.mark_dirty()
                     song_title = removed_song.get('title') if isinstance(removed_song, dict) else str(removed_song)
                     logger.info(f"[自动播放] ✓ 已删除列表第一首: {song_title}")
             
@@ -819,7 +874,6 @@ class MusicPlayer:
                 
         except Exception as e:
             logger.error(f"[自动播放] ❌ 后端自动播放异常: {e}")
-            import traceback
             traceback.print_exc()
 
     def mpv_pipe_exists(self) -> bool:
@@ -859,6 +913,17 @@ class MusicPlayer:
         if self.mpv_pipe_exists():
             return True
 
+        # 串行化启动：并发调用时只有一个线程负责拉起 MPV，其余线程等待后复用结果
+        with self._mpv_start_lock:
+            if self.mpv_pipe_exists():
+                return True
+            return self._start_mpv()
+
+    def _start_mpv(self) -> bool:
+        """启动 MPV 进程并等待 IPC 管道就绪（调用方需持有 _mpv_start_lock）"""
+        # 旧进程的连接即将失效，先关闭，下次发送时重新连接
+        with self._ipc_lock:
+            self._close_ipc()
         # 清理任何现存的 mpv 进程，防止重复启动
         try:
             if os.name == "nt":
@@ -883,12 +948,11 @@ class MusicPlayer:
             # 构建完整的启动命令
             mpv_launch_cmd = self.mpv_cmd
             
-            # 【新增】检查环境变量中是否有运行时选择的音频设备
-            runtime_audio_device = os.environ.get("MPV_AUDIO_DEVICE", "")
+            # 【新增】检查是否有运行时选择的音频设备
+            runtime_audio_device = self.runtime_audio_device
             if runtime_audio_device:
                 # 移除现有的 --audio-device 参数
-                import re
-                mpv_launch_cmd = re.sub(r'\s*--audio-device=[^\s]+', '', mpv_launch_cmd)
+                mpv_launch_cmd = _AUDIO_DEVICE_ARG_RE.sub('', mpv_launch_cmd)
                 mpv_launch_cmd = mpv_launch_cmd.strip() + f" --audio-device={runtime_audio_device}"
                 logger.info(f"使用运行时选择的音频设备: {runtime_audio_device}")
             
@@ -1024,6 +1088,58 @@ class MusicPlayer:
         
         return True
 
+    def _log_loadfile_command(self, cmd_list):
+        """loadfile 命令日志：显示文件地址和完整 MPV 配置"""
+        file_url = cmd_list[1] if len(cmd_list) > 1 else 'N/A'
+        logger.info(f"📂 [MPV 命令] loadfile: {file_url[:100]}{'...' if len(file_url) > 100 else ''}")
+        
+        # 显示当前 MPV 完整配置信息（包含运行时参数）
+        runtime_audio_device = self.runtime_audio_device
+        mpv_display_cmd = self.mpv_cmd
+        
+        if runtime_audio_device:
+            # 如果有运行时音频设备，显示完整命令
+            mpv_display_cmd = _AUDIO_DEVICE_ARG_RE.sub('', mpv_display_cmd)
+            mpv_display_cmd = mpv_display_cmd.strip() + f" --audio-device={runtime_audio_device}"
+        
+        logger.info(f"   🎵 MPV 完整命令: {mpv_display_cmd}")
+        
+        # 对于网络歌曲（YouTube等），显示额外的参数
+        is_network_url = file_url.startswith(('http://', 'https://'))
+        if is_network_url:
+            logger.info(f"   🌐 网络播放模式")
+            logger.info(f"   📋 完整命令参数: {mpv_display_cmd} \"{file_url}\"")
+            # 显示 ytdl 相关属性
+            try:
+                ytdl_format = self.mpv_get("ytdl-format")
+                if ytdl_format:
+                    logger.info(f"   🎬 ytdl-format: {ytdl_format}")
+            except:
+                pass
+
+    def _log_set_property_command(self, cmd_list):
+        """set_property 命令日志"""
+        if len(cmd_list) >= 3:
+            logger.info(f"⚙️  [MPV 命令] set_property: {cmd_list[1]} = {cmd_list[2]}")
+        else:
+            logger.info(f"⚙️  [MPV 命令] set_property: {cmd_list}")
+
+    def _log_cycle_command(self, cmd_list):
+        """cycle 命令日志"""
+        logger.info(f"🔄 [MPV 命令] cycle: {cmd_list[1] if len(cmd_list) > 1 else 'N/A'}")
+
+    def _log_stop_command(self, cmd_list):
+        """stop 命令日志"""
+        logger.info(f"⏹️  [MPV 命令] stop")
+
+    # 命令名 -> 日志函数；未登记的命令只输出 debug 日志
+    _MPV_COMMAND_LOGGERS = {
+        "loadfile": _log_loadfile_command,
+        "set_property": _log_set_property_command,
+        "cycle": _log_cycle_command,
+        "stop": _log_stop_command,
+    }
+
     def mpv_command(self, cmd_list) -> bool:
         """向 MPV 发送命令
 
@@ -1034,55 +1150,25 @@ class MusicPlayer:
             # Debug: 显示发送的命令
             logger.debug(f"mpv_command -> sending: {cmd_list} to pipe {self.pipe_name}")
             
-            # ✅ 对特定命令显示更详细的日志
-            if cmd_list and len(cmd_list) > 0:
+            # ✅ 对特定命令显示更详细的日志（按命令名查表分发）
+            if cmd_list:
                 cmd_name = cmd_list[0]
-                if cmd_name == "loadfile":
-                    file_url = cmd_list[1] if len(cmd_list) > 1 else 'N/A'
-                    logger.info(f"📂 [MPV 命令] loadfile: {file_url[:100]}{'...' if len(file_url) > 100 else ''}")
-                    
-                    # 显示当前 MPV 完整配置信息（包含运行时参数）
-                    runtime_audio_device = os.environ.get("MPV_AUDIO_DEVICE", "")
-                    mpv_display_cmd = self.mpv_cmd
-                    
-                    if runtime_audio_device:
-                        # 如果有运行时音频设备，显示完整命令
-                        import re
-                        mpv_display_cmd = re.sub(r'\s*--audio-device=[^\s]+', '', mpv_display_cmd)
-                        mpv_display_cmd = mpv_display_cmd.strip() + f" --audio-device={runtime_audio_device}"
-                    
-                    logger.info(f"   🎵 MPV 完整命令: {mpv_display_cmd}")
-                    
-                    # 对于网络歌曲（YouTube等），显示额外的参数
-                    is_network_url = file_url.startswith(('http://', 'https://'))
-                    if is_network_url:
-                        logger.info(f"   🌐 网络播放模式")
-                        logger.info(f"   📋 完整命令参数: {mpv_display_cmd} \"{file_url}\"")
-                        # 显示 ytdl 相关属性
-                        try:
-                            ytdl_format = self.mpv_get("ytdl-format")
-                            if ytdl_format:
-                                logger.info(f"   🎬 ytdl-format: {ytdl_format}")
-                        except:
-                            pass
-                        
-                elif cmd_name == "set_property":
-                    if len(cmd_list) >= 3:
-                        logger.info(f"⚙️  [MPV 命令] set_property: {cmd_list[1]} = {cmd_list[2]}")
-                    else:
-                        logger.info(f"⚙️  [MPV 命令] set_property: {cmd_list}")
-                elif cmd_name == "cycle":
-                    logger.info(f"🔄 [MPV 命令] cycle: {cmd_list[1] if len(cmd_list) > 1 else 'N/A'}")
-                elif cmd_name == "stop":
-                    logger.info(f"⏹️  [MPV 命令] stop")
+                log_func = self._MPV_COMMAND_LOGGERS.get(cmd_name)
+                if log_func is not None:
+                    log_func(self, cmd_list)
                 else:
                     logger.debug(f"[MPV 命令] {cmd_name}: {cmd_list[1:] if len(cmd_list) > 1 else 'N/A'}")
             
-            with open(self.pipe_name, "wb") as w:
-                json_cmd = json.dumps({"command": cmd_list})
-                w.write((json_cmd + "\n").encode("utf-8"))
-                logger.debug(f"✅ 命令已发送到管道: {self.pipe_name}")
-                logger.debug(f"  JSON内容: {json_cmd}")
+            try:
+                frame = _MPV_STATIC_FRAMES.get(tuple(cmd_list))
+            except TypeError:
+                frame = None
+            if frame is None:
+                frame = (json.dumps({"command": cmd_list}) + "\n").encode("utf-8")
+            
+            self._ipc_send(frame)
+            logger.debug(f"✅ 命令已发送到管道: {self.pipe_name}")
+            logger.debug(f"  JSON内容: {frame!r}")
 
         try:
             _write()
@@ -1101,8 +1187,6 @@ class MusicPlayer:
                     return False
             return False
         except Exception as e:
-            import traceback
-
             logger.error(f"❌ 写入命令失败: {e}")
             logger.debug(f"  异常类型: {type(e).__name__}")
             logger.debug(f"  管道路径: {repr(self.pipe_name)}")
@@ -1135,32 +1219,140 @@ class MusicPlayer:
                     return False
             return False
 
-    def mpv_request(self, payload: dict):
-        """向 MPV 发送请求并等待响应"""
-        with open(self.pipe_name, "r+b", 0) as f:
-            f.write((json.dumps(payload) + "\n").encode("utf-8"))
-            f.flush()
-            while True:
+    @staticmethod
+    def _decode_ipc_line(line: bytes):
+        """解析 MPV IPC 返回的一行 JSON，无法解析时返回 None"""
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # 少数事件行可能含非法 UTF-8，回退到宽松解码
+            try:
+                return json.loads(line.decode("utf-8", "ignore"))
+            except Exception:
+                return None
+
+    # ========== MPV IPC 连接 ==========
+
+    def _close_ipc(self):
+        """关闭持久 IPC 连接（调用方需持有 _ipc_lock）"""
+        if self._ipc is not None:
+            try:
+                self._ipc.close()
+            except OSError:
+                pass
+            self._ipc = None
+            self._ipc_pipe_name = None
+            self._ipc_unread = 0
+
+    def _next_request_id(self) -> int:
+        """分配 request_id（请求线程、标题探测线程、事件线程都会调用，需加锁）"""
+        with self._req_id_lock:
+            self._req_id += 1
+            return self._req_id
+
+    def _ipc_handle(self):
+        """获取持久 IPC 连接，未连接或管道名变化时重新打开（调用方需持有 _ipc_lock）"""
+        if self._ipc is not None and self._ipc_pipe_name != self.pipe_name:
+            self._close_ipc()
+        if self._ipc is None:
+            f = open(self.pipe_name, "r+b", 0)
+            f.write(_MPV_DISABLE_EVENTS_FRAME)
+            self._ipc = f
+            self._ipc_pipe_name = self.pipe_name
+            self._ipc_unread = 1  # disable_event 的回复
+        return self._ipc
+
+    def _ipc_send(self, frames: bytes, request_ids=()) -> dict:
+        """通过持久连接发送 IPC 帧，并按 request_id 收集响应
+
+        MPV 对每个命令帧都回复一行（已禁用事件推送）。不等待回复的命令只写入，
+        其回复在之后的读取中顺带读走；只有写入失败（如 MPV 重启后旧连接失效）
+        时才重连重发一次，已写入的命令不会因读取出错被重复执行。
+
+        返回:
+          {request_id: 响应对象}，未收到的响应不包含在内
+        """
+        with self._ipc_lock:
+            for attempt in (0, 1):
+                try:
+                    f = self._ipc_handle()
+                    f.write(frames)
+                    break
+                except OSError:
+                    self._close_ipc()
+                    if attempt:
+                        raise
+            self._ipc_unread += frames.count(b"\n")
+            return self._ipc_read_replies(f, set(request_ids))
+
+    def _ipc_read_replies(self, f, pending: set) -> dict:
+        """读取回复直到收齐 pending 中的 request_id（调用方需持有 _ipc_lock）
+
+        没有等待项时只读走已经到达的回复，不阻塞；等待回复时每行最多等
+        _MPV_IPC_REPLY_TIMEOUT 秒，超时或读取出错即关闭连接（迟到的回复随连接丢弃）。
+        """
+        replies = {}
+        try:
+            while pending or self._ipc_unread > 0:
+                if not _ipc_wait_readable(f, _MPV_IPC_REPLY_TIMEOUT if pending else 0):
+                    if pending:
+                        logger.warning(f"[IPC] 等待 MPV 回复超时，关闭连接: request_id={sorted(pending)}")
+                        self._close_ipc()
+                    break
                 line = f.readline()
                 if not line:
+                    # MPV 关闭了连接
+                    self._close_ipc()
                     break
-                try:
-                    obj = json.loads(line.decode("utf-8", "ignore"))
-                except Exception:
+                if self._ipc_unread > 0:
+                    self._ipc_unread -= 1
+                obj = self._decode_ipc_line(line)
+                if obj is None:
                     continue
-                if obj.get("request_id") == payload.get("request_id"):
-                    return obj
-        return None
+                req_id = obj.get("request_id")
+                if req_id in pending:
+                    pending.discard(req_id)
+                    replies[req_id] = obj
+        except OSError as e:
+            logger.debug(f"[IPC] 读取 MPV 回复失败，关闭连接: {e}")
+            self._close_ipc()
+        return replies
+
+    def mpv_request(self, payload: dict):
+        """向 MPV 发送请求并等待响应"""
+        req_id = payload.get("request_id")
+        replies = self._ipc_send((json.dumps(payload) + "\n").encode("utf-8"), (req_id,))
+        return replies.get(req_id)
 
     def mpv_get(self, prop: str):
         """获取 MPV 属性值"""
-        self._req_id += 1
-        req = {"command": ["get_property", prop], "request_id": self._req_id}
+        req = {"command": ["get_property", prop], "request_id": self._next_request_id()}
         resp = self.mpv_request(req)
         if not resp:
             return None
         return resp.get("data")
 
+    def mpv_get_many(self, props) -> dict:
+        """批量获取多个 MPV 属性（一次管道往返）
+
+        所有 get_property 请求带上各自的 request_id 一次性写入，
+        再按 request_id 收集响应，避免每个属性都单独打开管道往返一次。
+
+        返回:
+          {属性名: 值}，未取到的属性值为 None
+        """
+        result = dict.fromkeys(props)
+        pending = {}
+        frames = []
+        for prop in props:
+            req_id = self._next_request_id()
+            pending[req_id] = prop
+            frames.append(json.dumps({"command": ["get_property", prop], "request_id": req_id}))
+        replies = self._ipc_send(("\n".join(frames) + "\n").encode("utf-8"), pending)
+        for req_id, obj in replies.items():
+            result[pending[req_id]] = obj.get("data")
+        return result
+
     def mpv_set(self, prop: str, value) -> bool:
         """设置 MPV 属性值"""
         try:
@@ -1220,6 +1412,22 @@ class MusicPlayer:
         """
         return self.mpv_command(["cycle", "pause"])
 
+    def cycle_pause(self):
+        """切换暂停状态并返回切换后的状态（一次管道往返）
+
+        cycle 命令与 get_property 一起写入：MPV 按顺序处理同一连接上的命令，
+        读到的即是切换后的值，不存在先读后写之间被其他请求插入的竞态。
+
+        返回:
+          切换后的暂停状态；未取到时为 None
+        """
+        req_id = self._next_request_id()
+        frame = _MPV_STATIC_FRAMES[("cycle", "pause")] + (
+            json.dumps({"command": ["get_property", "pause"], "request_id": req_id}) + "\n"
+        ).encode("utf-8")
+        reply = self._ipc_send(frame, (req_id,)).get(req_id)
+        return reply.get("data") if reply else None
+
     def toggle_loop_mode(self) -> int:
         """循环播放模式切换: 0=不循环 -> 1=单曲循环 -> 2=全部循环 -> 0
 
@@ -1735,7 +1943,7 @@ class MusicPlayer:
                         if save_to_history and not self.playback_history.is_empty():
                             history_items = self.playback_history.get_all()
                             if history_items and history_items[0]["url"] == url:
-                                self.playback_history.update_item(0, name=media_title)
+                                self.playback_history.update_item(0, title=media_title)
                         logger.debug(f"mpv media-title 探测到 (尝试 {attempt+1}): {media_title}") 
                         break
                     else:
@@ -1751,8 +1959,6 @@ class MusicPlayer:
             return True
         except Exception as e:
             logger.error(f"play_url failed for {url}: {e}")
-            import traceback
-
             traceback.print_exc()
             raise
 
@@ -1934,7 +2140,7 @@ class MusicPlayer:
                                     history_items = self.playback_history.get_all()
                                     if history_items and history_items[0]["url"] == url:
                                         self.playback_history.update_item(
-                                            0, name=media_title
+                                            0, title=media_title
                                         )
                                 logger.debug(f"获取到串流媒体标题 (尝试 {attempt+1}): {media_title}") 
                                 break
@@ -1953,8 +2159,6 @@ class MusicPlayer:
             return True
         except Exception as e:
             logger.error(f"play() failed: {e}")
-            import traceback
-
             traceback.print_exc()
             return False
 
@@ -5,6 +5,7 @@
 import json
 import os
 import logging
+import traceback
 from abc import ABC, abstractmethod
 from .song import Song, LocalSong, StreamSong
 
@@ -28,13 +29,13 @@ class BasePlaylist(ABC):
         """添加项目到列表最上位置"""
         self._items.insert(0, item)
         if self._max_size and len(self._items) > self._max_size:
-            self._items = self._items[:self._max_size]
+            del self._items[self._max_size:]
 
     def insert(self, index: int, item):
         """在指定位置插入项目"""
         self._items.insert(index, item)
         if self._max_size and len(self._items) > self._max_size:
-            self._items = self._items[-self._max_size :]
+            del self._items[:-self._max_size]
 
     def remove(self, index: int):
         """删除指定位置的项目"""
@@ -194,7 +195,6 @@ class CurrentPlaylist(BasePlaylist):
             logger.info(f"播放列表已重排序（sort_by={sort_by}, reverse={reverse}）")
         except Exception as e:
             logger.error(f"播放列表排序失败: {e}")
-            import traceback
             traceback.print_exc()
 
     def play(self,
@@ -318,6 +318,7 @@ class PlayHistory(Playlist):
         """
         super().__init__(max_size=max_size)
         self._file_path = file_path
+        self.version = 0  # 数据版本号，历史变更时递增（用于 ETag）
 
     def add_to_history(self, url_or_path: str, name: str, is_local: bool = False, thumbnail_url: str = None):
         """添加项目到历史记录，聚合相同URL的播放并记录每次播放时间
@@ -379,11 +380,13 @@ class PlayHistory(Playlist):
             song.timestamps = str(current_timestamp)  # 第一次播放的时间戳
             
             self._items.insert(0, song)
-            # 保持列表大小限制
+            # 保持列表大小限制（原地截断超出部分，不复制整个列表）
             if self._max_size and len(self._items) > self._max_size:
-                self._items = self._items[: self._max_size]
+                del self._items[self._max_size:]
             logger.debug(f"已添加播放历史: {name} ({song.type})，时间戳: {current_timestamp}")
 
+        self.version += 1
+
         # 保存到文件
         if self._file_path:
             self.save()
@@ -435,6 +438,7 @@ class PlayHistory(Playlist):
                             # 恢复每次播放的时间戳列表
                             song.timestamps = item.get('timestamps', str(song.timestamp))
                             self._items.append(song)
+                    self.version += 1
                     logger.info(f"已加载 {len(self._items)} 条播放历史")
                 else:
                     self._items = []
@@ -447,12 +451,14 @@ class PlayHistory(Playlist):
 
         参数:
           index: 项目索引
-          **kwargs: 要更新的属性（如 name, title 等）
+          **kwargs: 要更新的属性（如 title 等；name 视为 title 的别名）
         """
         if 0 <= index < len(self._items):
             song = self._items[index]
             for key, value in kwargs.items():
-                setattr(song, key, value)
+                # Song 使用 __slots__，没有 name 属性；to_dict 中的 name 即 title
+                setattr(song, "title" if key == "name" else key, value)
+            self.version += 1
             if self._file_path:
                 self.save()
 
@@ -482,8 +488,8 @@ class PlayHistory(Playlist):
                 timestamps_str = getattr(song, 'timestamps', '')
                 if timestamps_str:
                     try:
-                        return [int(ts) for ts in timestamps_str.split(',')]
-                    except:
+                        return list(map(int, timestamps_str.split(',')))
+                    except ValueError:
                         return []
         return []
 
@@ -491,6 +497,7 @@ class PlayHistory(Playlist):
         """清空所有播放历史"""
         self._items = []
         self._current_index = -1
+        self.version += 1
         if self._file_path:
             self.save()
         logger.info("播放历史已清空")
@@ -7,8 +7,11 @@
 import json
 import time
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+import orjson
 
 from models.song import StreamSong
 from models.logger import logger
@@ -16,9 +19,27 @@ from models.logger import logger
 DEFAULT_PLAYLIST_ID = "default"
 
 
+def _entry_from_path(song_path: str) -> Dict:
+    """将旧版字符串路径条目转换为标准 dict 条目"""
+    return {
+        "url": song_path,
+        "title": os.path.basename(song_path),
+        "type": "youtube" if song_path.startswith(("http://", "https://")) else "local",
+    }
+
+
 class Playlist:
     """单个播放列表"""
 
+    __slots__ = (
+        "id",
+        "name",
+        "songs",
+        "created_at",
+        "updated_at",
+        "current_playing_index",
+    )
+
     def __init__(
         self,
         playlist_id: str = None,
@@ -45,9 +66,18 @@ class Playlist:
         self.updated_at = updated_at or time.time()
         self.current_playing_index = current_playing_index
 
+        # 旧版字符串条目在加载时统一转换为 dict，播放时无需再判断条目类型
+        self._upgrade_legacy_entries()
         # 确保串流歌曲具备缩略图（兼容旧数据）
         self._hydrate_stream_thumbnails()
 
+    def _upgrade_legacy_entries(self):
+        """将旧版字符串路径条目原地转换为 dict 条目"""
+        songs = self.songs
+        for i, song_item in enumerate(songs):
+            if isinstance(song_item, str):
+                songs[i] = _entry_from_path(song_item)
+
     def _hydrate_stream_thumbnails(self):
         """补全串流歌曲的缩略图，避免旧数据缺失 thumbnail_url"""
         changed = False
@@ -85,39 +115,31 @@ class Playlist:
         返回:
             True 如果添加成功，False 如果歌曲已存在
         """
-        # 支持dict和str两种格式
+        # 支持dict和str两种格式（字符串路径转换为 dict 后统一处理）
         if isinstance(song_path_or_dict, dict):
             song_item = song_path_or_dict
-            # 补充串流歌曲缩略图
-            if (
-                isinstance(song_item, dict)
-                and song_item.get("type") in ("youtube", "stream")
-                and not song_item.get("thumbnail_url")
-            ):
-                try:
-                    stream_song = StreamSong(
-                        stream_url=song_item.get("url", ""),
-                        title=song_item.get("title"),
-                        stream_type=song_item.get("type"),
-                        duration=song_item.get("duration", 0),
-                    )
-                    thumb = stream_song.get_thumbnail_url()
-                    if thumb:
-                        song_item["thumbnail_url"] = thumb
-                except Exception:
-                    pass
-            # 用URL作为唯一键进行去重检查
-            url = song_item.get("url")
-            if not any(isinstance(s, dict) and s.get("url") == url for s in self.songs):
-                self.songs.insert(0, song_item)
-                self.updated_at = time.time()
-                return True
         else:
-            # 字符串路径方式（向后兼容）
-            if song_path_or_dict not in self.songs:
-                self.songs.insert(0, song_path_or_dict)
-                self.updated_at = time.time()
-                return True
+            song_item = _entry_from_path(song_path_or_dict)
+        # 补充串流歌曲缩略图
+        if song_item.get("type") in ("youtube", "stream") and not song_item.get("thumbnail_url"):
+            try:
+                stream_song = StreamSong(
+                    stream_url=song_item.get("url", ""),
+                    title=song_item.get("title"),
+                    stream_type=song_item.get("type"),
+                    duration=song_item.get("duration", 0),
+                )
+                thumb = stream_song.get_thumbnail_url()
+                if thumb:
+                    song_item["thumbnail_url"] = thumb
+            except Exception:
+                pass
+        # 用URL作为唯一键进行去重检查
+        url = song_item.get("url")
+        if not any(s.get("url") == url for s in self.songs):
+            self.songs[0:0] = (song_item,)
+            self.updated_at = time.time()
+            return True
         return False
 
     def remove(self, index: int) -> bool:
@@ -137,8 +159,15 @@ class Playlist:
             or not (0 <= to_index < len(self.songs))
         ):
             return False
-        song = self.songs.pop(from_index)
-        self.songs.insert(to_index, song)
+        songs = self.songs
+        if abs(from_index - to_index) == 1:
+            # 相邻移动（拖拽最常见的情况）：原地交换，无需移动其余元素
+            songs[from_index], songs[to_index] = songs[to_index], songs[from_index]
+        elif from_index < to_index:
+            # 只轮转 [from, to] 区间：一次切片赋值，区间外元素不移动
+            songs[from_index:to_index + 1] = songs[from_index + 1:to_index + 1] + [songs[from_index]]
+        elif from_index > to_index:
+            songs[to_index:from_index + 1] = [songs[from_index]] + songs[to_index:from_index]
         self.updated_at = time.time()
         return True
 
@@ -151,10 +180,11 @@ class Playlist:
         返回:
             True 如果移除成功，False 如果歌曲不存在
         """
-        if song_path in self.songs:
-            self.songs.remove(song_path)
-            self.updated_at = time.time()
-            return True
+        for i, song_item in enumerate(self.songs):
+            if song_item.get("url") == song_path:
+                del self.songs[i]
+                self.updated_at = time.time()
+                return True
         return False
 
     def remove_song_at_index(self, index: int) -> Optional[str]:
@@ -195,14 +225,14 @@ class Playlist:
             True 如果排序成功，False 如果新列表有效性检查失败
         """
         if set(new_order) == set(self.songs):
-            self.songs = new_order
+            self.songs[:] = new_order
             self.updated_at = time.time()
             return True
         return False
 
     def clear(self):
-        """清空歌单中的所有歌曲"""
-        self.songs = []
+        """清空歌单中的所有歌曲（原地清空，已持有的列表引用保持有效）"""
+        self.songs.clear()
         self.updated_at = time.time()
 
     def get_all(self) -> List:
@@ -261,6 +291,11 @@ class Playlists:
         self.data_file = data_file
         self._playlists: Dict[str, Playlist] = {}  # 按 ID 索引
         self._order: List[str] = []  # 歌单的显示顺序
+        self.version = 0  # 数据版本号，每次修改递增（用于响应缓存失效）
+        self.dirty = False  # 是否有尚未写盘的修改
+        self._written_version = -1  # 已写入文件的数据版本
+        self._write_lock = threading.Lock()
+        self._dirty_listener = None  # 标记脏数据时的通知回调（由自动保存任务注册）
         self.load()
 
     def load(self):
@@ -308,19 +343,74 @@ class Playlists:
                 self._order.insert(0, DEFAULT_PLAYLIST_ID)
             self.save()
 
+        # 刚从文件加载的数据与磁盘一致
+        with self._write_lock:
+            self._written_version = max(self._written_version, self.version)
+
+    def has_unsaved_changes(self) -> bool:
+        """数据版本是否比已写入文件的版本新
+
+        以版本号而不是 dirty 标记判断：dirty 在 snapshot() 时即被清除，
+        后台写盘失败后仍可能为 False，但已写入版本不会前进。
+        """
+        return self.version > self._written_version
+
     def save(self):
-        """保存歌单数据到文件"""
+        """立即保存歌单数据到文件"""
+        self.version += 1
         try:
-            data = {
-                "order": self._order,
-                "playlists": [pl.to_dict() for pl in self.get_all()],
-            }
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.debug(f"已保存 {len(self._playlists)} 个歌单")
+            self.write_snapshot(*self.snapshot())
         except Exception as e:
+            # snapshot() 已清除脏标记，写盘失败时恢复，避免这批修改被当作已保存
+            self.dirty = True
             logger.error(f"保存歌单失败: {e}")
 
+    def mark_dirty(self):
+        """标记歌单数据已修改，由后台任务合并延迟写盘（见 app 中的自动保存任务）"""
+        self.version += 1
+        self.dirty = True
+        if self._dirty_listener is not None:
+            self._dirty_listener()
+
+    def _commit(self):
+        """提交一次修改：有自动保存任务时只标记脏数据（由后台合并写盘），否则立即保存"""
+        if self._dirty_listener is not None:
+            self.mark_dirty()
+        else:
+            self.save()
+
+    def set_dirty_listener(self, listener):
+        """注册脏数据通知回调（传入 None 取消），回调可能在任意线程中被调用"""
+        self._dirty_listener = listener
+
+    def snapshot(self) -> Tuple[int, bytes]:
+        """序列化当前歌单数据并清除脏标记
+
+        返回:
+            (数据版本号, JSON 字节)
+        """
+        self.dirty = False
+        data = {
+            "order": self._order,
+            "playlists": [pl.to_dict() for pl in self.get_all()],
+        }
+        return self.version, orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+    def write_snapshot(self, version: int, payload: bytes):
+        """把快照写入文件（可在工作线程中执行），比已写入版本旧的快照直接丢弃
+
+        参数:
+            version: 快照对应的数据版本号
+            payload: snapshot() 生成的 JSON 字节
+        """
+        with self._write_lock:
+            if version <= self._written_version:
+                return
+            with open(self.data_file, "wb") as f:
+                f.write(payload)
+            self._written_version = version
+        logger.debug(f"已保存 {len(self._playlists)} 个歌单")
+
     def create_playlist(self, name: str) -> Playlist:
         """创建新歌单
 
@@ -333,7 +423,7 @@ class Playlists:
         playlist = Playlist(name=name)
         self._playlists[playlist.id] = playlist
         self._order.append(playlist.id)
-        self.save()
+        self._commit()
         logger.debug(f"创建新歌单: {name} (ID: {playlist.id})")
         return playlist
 
@@ -361,7 +451,7 @@ class Playlists:
             del self._playlists[playlist_id]
             if playlist_id in self._order:
                 self._order.remove(playlist_id)
-            self.save()
+            self._commit()
             logger.debug(f"删除歌单: {playlist_id}")
             return True
         return False
@@ -380,7 +470,7 @@ class Playlists:
         if playlist:
             playlist.name = new_name
             playlist.updated_at = time.time()
-            self.save()
+            self._commit()
             logger.debug(f"重命名歌单: {playlist_id} -> {new_name}")
             return True
         return False
@@ -416,7 +506,7 @@ class Playlists:
         """
         if set(new_order) == set(self._order):
             self._order = new_order
-            self.save()
+            self._commit()
             return True
         return False
 
@@ -434,7 +524,7 @@ class Playlists:
         if playlist:
             result = playlist.add_song(song_path)
             if result:
-                self.save()
+                self._commit()
             return result
         return False
 
@@ -452,7 +542,7 @@ class Playlists:
         if playlist:
             result = playlist.remove_song(song_path)
             if result:
-                self.save()
+                self._commit()
             return result
         return False
 
@@ -470,7 +560,7 @@ class Playlists:
         if playlist:
             song_path = playlist.remove_song_at_index(index)
             if song_path:
-                self.save()
+                self._commit()
             return song_path
         return None
 
@@ -502,7 +592,7 @@ class Playlists:
         if playlist:
             result = playlist.reorder_songs(new_order)
             if result:
-                self.save()
+                self._commit()
             return result
         return False
 
@@ -518,7 +608,7 @@ class Playlists:
         playlist = self._playlists.get(playlist_id)
         if playlist:
             playlist.clear()
-            self.save()
+            self._commit()
             return True
         return False
 
@@ -558,7 +648,7 @@ class Playlists:
             playlist = Playlist.from_dict(data)
             self._playlists[playlist.id] = playlist
             self._order.append(playlist.id)
-            self.save()
+            self._commit()
             logger.debug(f"已导入歌单: {playlist.name}")
             return playlist
         except Exception as e:
@@ -2,8 +2,11 @@
 排行榜模块 - 提供不同类型的排行榜功能
 """
 
+import heapq
 import time
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from operator import itemgetter
 from typing import List, Dict, Any
 
 
@@ -58,17 +61,16 @@ class Rank(ABC):
         if period == 'all':
             return items
 
-        import datetime
         now = time.time()
         
         if period == 'day':
             # 获取今天 00:00:00 的时间戳
-            today_start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             cutoff_time = today_start.timestamp()
         elif period == 'week':
             # 最近7天 - 从今天00:00往前推7天
-            today_start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            week_start = today_start - datetime.timedelta(days=7)
+            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            week_start = today_start - timedelta(days=7)
             cutoff_time = week_start.timestamp()
         elif period == 'month':
             # 最近30天
@@ -112,37 +114,61 @@ class HitRank(Rank):
         返回:
           按播放次数排序的列表
         """
+        rankings = self._aggregate(items, period)
+        rankings.sort(key=itemgetter('play_count'), reverse=True)
+        return rankings
+
+    def _count_by_url(self, items: List[Dict[str, Any]], period: str):
+        """按URL累加播放次数（只累加计数，不构造结果字典）
+
+        参数:
+          items: 播放历史项列表
+          period: 时间周期
+
+        返回:
+          (计数字典 {url: 播放次数}, 首次出现的条目 {url: item})
+        """
+        counts = {}
+        first_items = {}
         if not items:
-            return []
+            return counts, first_items
 
         # 按时间周期过滤
-        filtered_items = self._filter_by_period(items, period)
-
-        # 统计相同URL的播放次数
-        rankings_dict = {}
-        for item in filtered_items:
+        for item in self._filter_by_period(items, period):
             url = item.get('url')
             if not url:
                 continue
+            if url not in counts:
+                counts[url] = 0
+                first_items[url] = item
+            counts[url] += item.get('play_count', 1)
+
+        return counts, first_items
+
+    @staticmethod
+    def _ranking_entry(url: str, item: Dict[str, Any], play_count: int) -> Dict[str, Any]:
+        """构造排行榜条目"""
+        return {
+            'url': url,
+            'title': item.get('title') or item.get('name') or '未知歌曲',
+            'type': item.get('type', 'local'),
+            'thumbnail_url': item.get('thumbnail_url'),
+            'ts': item.get('ts', 0),
+            'play_count': play_count,
+        }
+
+    def _aggregate(self, items: List[Dict[str, Any]], period: str) -> List[Dict[str, Any]]:
+        """按URL聚合播放次数（不排序）
 
-            if url not in rankings_dict:
-                rankings_dict[url] = {
-                    'url': url,
-                    'title': item.get('title') or item.get('name') or '未知歌曲',
-                    'type': item.get('type', 'local'),
-                    'thumbnail_url': item.get('thumbnail_url'),
-                    'ts': item.get('ts', 0),
-                    'play_count': 0,
-                }
-
-            # 累加播放次数
-            rankings_dict[url]['play_count'] += item.get('play_count', 1)
-
-        # 转换为列表并按播放次数排序
-        rankings = list(rankings_dict.values())
-        rankings.sort(key=lambda x: x['play_count'], reverse=True)
+        参数:
+          items: 播放历史项列表
+          period: 时间周期
 
-        return rankings
+        返回:
+          聚合后的列表
+        """
+        counts, first_items = self._count_by_url(items, period)
+        return [self._ranking_entry(url, first_items[url], count) for url, count in counts.items()]
 
     def get_rankings(self, items: List[Dict[str, Any]], period: str = 'all', limit: int = 10) -> List[Dict[str, Any]]:
         """获取播放排行
@@ -155,16 +181,16 @@ class HitRank(Rank):
         返回:
           排行榜列表，每项带有 'rank' 字段
         """
-        # 计算排行
-        rankings = self.calculate(items, period)
-
-        # 限制条数
-        rankings = rankings[:min(limit, self._max_size)]
+        counts, first_items = self._count_by_url(items, period)
 
-        # 添加排名
-        for idx, item in enumerate(rankings, 1):
-            item['rank'] = idx
+        # 只取前 N 名：先在 (url, 次数) 上做堆选择 O(n log k)，只为入选条目构造字典
+        top = heapq.nlargest(min(limit, self._max_size), counts.items(), key=itemgetter(1))
 
+        rankings = []
+        for idx, (url, count) in enumerate(top, 1):
+            entry = self._ranking_entry(url, first_items[url], count)
+            entry['rank'] = idx
+            rankings.append(entry)
         return rankings
 
     def get_top_n(self, items: List[Dict[str, Any]], n: int = 3, period: str = 'all') -> List[Dict[str, Any]]:
@@ -6,6 +6,8 @@
 import os
 import sys
 import time
+import logging
+import traceback
 from urllib.parse import urlparse, parse_qs
 from models.logger import logger
 
@@ -13,6 +15,20 @@ from models.logger import logger
 class Song:
     """歌曲基类 - 可以是本地文件或串流媒体"""
 
+    # 使用 __slots__ 固定属性，减少大歌单/播放历史的内存占用
+    # play_count / ts / timestamps 仅在播放历史中按需设置
+    __slots__ = (
+        "url",
+        "title",
+        "type",
+        "duration",
+        "timestamp",
+        "thumbnail_url",
+        "ts",
+        "play_count",
+        "timestamps",
+    )
+
     def __init__(
         self, url: str, title: str = None, song_type: str = "local", duration: float = 0, thumbnail_url: str = None
     ):
@@ -89,6 +105,8 @@ class Song:
 class LocalSong(Song):
     """本地歌曲类 - 代表本地文件系统中的音乐文件"""
 
+    __slots__ = ("file_path",)
+
     def __init__(self, file_path: str, title: str = None, duration: float = 0):
         """
         初始化本地歌曲对象
@@ -102,15 +120,26 @@ class LocalSong(Song):
             url=file_path, title=title, song_type="local", duration=duration
         )
         self.file_path = file_path
-        self.file_name = os.path.basename(file_path)
-        self.file_extension = os.path.splitext(file_path)[1].lower()
+
+    # 文件名/扩展名只在序列化时用到，按需计算，播放路径上构造对象时不再拆分路径
+    @property
+    def file_name(self) -> str:
+        """文件名（含扩展名）"""
+        return os.path.basename(self.file_path)
+
+    @property
+    def file_extension(self) -> str:
+        """小写文件扩展名"""
+        return os.path.splitext(self.file_path)[1].lower()
+
+    @staticmethod
+    def title_from_path(file_path: str) -> str:
+        """从文件路径提取标题（文件名去除扩展名）"""
+        return os.path.splitext(os.path.basename(file_path))[0]
 
     def _extract_title_from_url(self, url: str) -> str:
         """从文件路径提取标题"""
-        filename = os.path.basename(url)
-        # 去除文件扩展名
-        name_without_ext = os.path.splitext(filename)[0]
-        return name_without_ext
+        return self.title_from_path(url)
 
     def exists(self) -> bool:
         """检查文件是否存在"""
@@ -190,6 +219,8 @@ class LocalSong(Song):
 class StreamSong(Song):
     """串流歌曲类 - 代表在线串流媒体（如YouTube）"""
 
+    __slots__ = ("stream_url", "stream_type", "video_id")
+
     def __init__(
         self,
         stream_url: str,
@@ -413,7 +444,6 @@ class StreamSong(Song):
             return True
         except Exception as e:
             logger.error(f"❌ [StreamSong.play] 播放失败: {type(e).__name__}: {e}")
-            import traceback
             logger.error(f"❌ 堆栈:\n{traceback.format_exc()}")
             return False
 
@@ -487,7 +517,6 @@ class StreamSong(Song):
                 return {"status": "OK", "results": results}
         except Exception as e:
             logger.error(f"YouTube 搜索失败: {str(e)}")
-            import traceback
 
             traceback.print_exc()
             return {"status": "ERROR", "error": f"搜索失败: {str(e)}"}
@@ -523,10 +552,12 @@ class StreamSong(Song):
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 result = ydl.extract_info(url, download=False)
 
+                # 调试输出只在 DEBUG 级别启用时格式化，避免逐项 print 拖慢大列表提取
+                debug_enabled = logger.isEnabledFor(logging.DEBUG)
                 logger.debug(f"提取结果类型: {type(result)}")
-                if result:
-                    print(
-                        f"[DEBUG] 结果包含键: {result.keys() if isinstance(result, dict) else 'N/A'}"
+                if result and debug_enabled:
+                    logger.debug(
+                        f"结果包含键: {result.keys() if isinstance(result, dict) else 'N/A'}"
                     )
 
                 entries = []
@@ -538,9 +569,10 @@ class StreamSong(Song):
                             logger.warning(f"第 {idx} 项为空，跳过")
                             continue
 
-                        print(
-                            f"[DEBUG] 处理第 {idx} 项: {item.keys() if isinstance(item, dict) else type(item)}"
-                        )
+                        if debug_enabled:
+                            logger.debug(
+                                f"处理第 {idx} 项: {item.keys() if isinstance(item, dict) else type(item)}"
+                            )
 
                         # 获取视频 ID
                         video_id = item.get("id") or item.get("video_id")
@@ -566,7 +598,8 @@ class StreamSong(Song):
                         # 生成缩略图 URL（使用 sddefault 中等质量，前端会降级到 mqdefault/default）
                         thumbnail_url = f"https://img.youtube.com/vi/{video_id}/sddefault.jpg" if video_id else ""
 
-                        logger.debug(f"添加视频: {title} - {entry_url}")
+                        if debug_enabled:
+                            logger.debug(f"添加视频: {title} - {entry_url}")
 
                         entries.append(
                             {
@@ -590,7 +623,6 @@ class StreamSong(Song):
                     return {"status": "ERROR", "error": "播放列表为空或无法解析"}
         except Exception as e:
             logger.error(f"提取播放列表失败: {str(e)}")
-            import traceback
 
             traceback.print_exc()
             return {"status": "ERROR", "error": f"提取播放列表失败: {str(e)}"}
@@ -650,10 +682,78 @@ class StreamSong(Song):
                     return {"status": "ERROR", "error": "无法获取视频信息"}
         except Exception as e:
             logger.error(f"提取视频元数据失败: {str(e)}")
-            import traceback
 
             traceback.print_exc()
             return {"status": "ERROR", "error": f"提取视频元数据失败: {str(e)}"}
 
+    @staticmethod
+    def extract_url(url: str, max_results: int = 10) -> dict:
+        """提取 YouTube URL（播放列表或单个视频，一次 yt-dlp 调用）
+
+        播放列表只展开条目基本信息（extract_flat="in_playlist"），单个视频
+        则直接返回其元数据，调用方无需先试播放列表再回退到单视频提取。
+
+        参数:
+          url: 播放列表或视频 URL
+          max_results: 播放列表最大提取数量（默认10）
+
+        返回:
+          {'status': 'OK', 'type': 'playlist'/'video', 'entries': [...]} 或 {'status': 'ERROR', 'error': '错误信息'}
+        """
+        if not url or not url.strip():
+            return {"status": "ERROR", "error": "URL 不能为空"}
+
+        try:
+            import yt_dlp
+
+            logger.debug(f"提取 URL: {url}")
+
+            ydl_opts = {
+                "quiet": True,
+                "no_warnings": True,
+                "extract_flat": "in_playlist",
+                "noplaylist": False,
+                "skip_download": True,
+                "ignoreerrors": True,
+                "playliststart": 1,
+                "playlistend": max_results,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                result = ydl.extract_info(url, download=False)
+
+            if not result:
+                return {"status": "ERROR", "error": "无法解析该 URL"}
+
+            is_playlist = result.get("_type") == "playlist" or "entries" in result
+            items = [item for item in (result.get("entries") or []) if item] if is_playlist else [result]
+
+            entries = []
+            for item in items[:max_results]:
+                video_id = item.get("id") or item.get("video_id")
+                if video_id:
+                    entry_url = f"https://www.youtube.com/watch?v={video_id}"
+                else:
+                    entry_url = item.get("webpage_url") or item.get("url") or (url if not is_playlist else "")
+                if not entry_url:
+                    continue
+                entries.append(
+                    {
+                        "url": entry_url,
+                        "title": item.get("title") or "未知标题",
+                        "id": video_id or "",
+                        "duration": item.get("duration", 0),
+                        "type": "youtube",
+                        "thumbnail_url": f"https://img.youtube.com/vi/{video_id}/sddefault.jpg" if video_id else "",
+                        "uploader": item.get("uploader", "Unknown"),
+                    }
+                )
+
+            if not entries:
+                return {"status": "ERROR", "error": "没有可用的视频"}
+            return {"status": "OK", "type": "playlist" if is_playlist else "video", "entries": entries}
+        except Exception as e:
+            logger.error(f"提取 URL 失败: {str(e)}")
+            return {"status": "ERROR", "error": f"提取 URL 失败: {str(e)}"}
+
     def __repr__(self):
         return f"StreamSong(title='{self.title}', type='{self.stream_type}', id='{self.video_id}')"
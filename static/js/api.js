@@ -21,6 +21,8 @@ export class MusicAPI {
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(data)
             });
+            // 204 无响应体，视为成功
+            if (response.status === 204) return { status: 'OK' };
             return await response.json();
         } catch (err) {
             console.warn(`[API] POST ${endpoint} failed:`, err);
@@ -73,13 +75,7 @@ export class MusicAPI {
     }
 
     async play(url, title, type = 'local', duration = 0) {
-        const formData = new FormData();
-        formData.append('url', url);
-        formData.append('title', title);
-        formData.append('type', type);
-        formData.append('duration', duration);
-        
-        return this.postForm('/play', formData);
+        return this.post('/play', { url: url || '', title: title || '', type: type || 'local', duration: Number(duration) || 0 });
     }
 
     async pause() {
@@ -95,15 +91,11 @@ export class MusicAPI {
     }
 
     async setVolume(value) {
-        const formData = new FormData();
-        formData.append('value', value);
-        return this.postForm('/volume', formData);
+        return this.post('/volume', { value });
     }
 
     async seek(percent) {
-        const formData = new FormData();
-        formData.append('percent', percent);
-        return this.postForm('/seek', formData);
+        return this.post('/seek', { percent: Number(percent) || 0 });
     }
 
     async loop() {
@@ -179,20 +171,60 @@ export class MusicAPI {
         return this.post('/search_song', { query });
     }
 
+    // 流式搜索：本地 / YouTube 结果谁先完成先回调 onChunk({local: [...]} 或 {youtube: [...]})
+    // 全部完成后返回与 searchSong 相同结构的合并结果
+    async searchSongStream(query, onChunk) {
+        const result = { status: 'OK', local: [], youtube: [] };
+        try {
+            const response = await fetch(`${this.baseURL}/search_song/stream`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ query })
+            });
+            if (!response.ok || !response.body) {
+                return await response.json();
+            }
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            const handleLine = async (line) => {
+                if (!line.trim()) return;
+                const chunk = JSON.parse(line);
+                if (chunk.local) result.local = chunk.local;
+                if (chunk.youtube) result.youtube = chunk.youtube;
+                if (onChunk) await onChunk(chunk);
+            };
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                for (const line of lines) {
+                    await handleLine(line);
+                }
+            }
+            await handleLine(buffer + decoder.decode());
+            return result;
+        } catch (err) {
+            console.warn('[API] POST /search_song/stream failed:', err);
+            return {};
+        }
+    }
+
     async searchYoutube(query) {
-        const formData = new FormData();
-        formData.append('query', query);
-        return this.postForm('/search_youtube', formData);
+        return this.post('/search_youtube', { query });
     }
 
     // 播放历史 API
     async addSongToHistory({ url, title, type = 'local', thumbnail_url = '' }) {
-        const formData = new FormData();
-        formData.append('url', url || '');
-        formData.append('title', title || url || '');
-        formData.append('type', type || 'local');
-        if (thumbnail_url) formData.append('thumbnail_url', thumbnail_url);
-        return this.postForm('/song_add_to_history', formData);
+        const data = {
+            url: url || '',
+            title: title || url || '',
+            type: type || 'local'
+        };
+        if (thumbnail_url) data.thumbnail_url = thumbnail_url;
+        return this.post('/song_add_to_history', data);
     }
 
     // ✅ 新增：获取已合并的播放历史（相同歌曲仅显示最后播放时间）
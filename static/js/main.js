@@ -1124,9 +1124,11 @@ class MusicPlayerApp {
     setVolumeDebounced(value) {
         clearTimeout(this._volumeDebounceTimer);
         this._volumeDebounceTimer = setTimeout(() => {
-            const form = new FormData();
-            form.append('value', value);
-            fetch('/volume', { method: 'POST', body: form }).catch(()=>{});
+            fetch('/volume', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ value })
+            }).catch(()=>{});
         }, 200);
     }
 
@@ -213,50 +213,33 @@ export class SearchManager {
             // 显示全屏加载动画
             searchLoading.show('🔍 正在搜索...');
             
-            // 调用搜索API
-            const result = await this.search(query);
-            
+            // 播放历史与搜索并行拉取
+            const historyPromise = this.fetchHistoryMatches(query);
+
+            // 流式搜索：本地结果先到先渲染，不必等待较慢的 YouTube 搜索
+            let localResults = [];
+            let youtubeResults = [];
+            let youtubePending = true;
+            let rendered = false;
+            const result = await this.search(query, async (chunk) => {
+                if (chunk.local) localResults = chunk.local;
+                if (chunk.youtube) {
+                    youtubeResults = chunk.youtube;
+                    youtubePending = false;
+                }
+                this.renderSearchResults(localResults, youtubeResults, await historyPromise, youtubePending);
+                rendered = true;
+                searchLoading.hide();
+            });
+
             if (!result || result.status !== 'OK') {
                 throw new Error(result?.error || '搜索失败');
             }
-            
-            const localResults = result.local || [];
-            const youtubeResults = result.youtube || [];
-
-
-                // 拉取已合并的播放历史并按 query 过滤后传入渲染（使历史成为一个独立标签）
-                let history = [];
-                try {
-                    const hres = await api.getPlaybackHistoryMerged();
-                    if (hres && hres.status === 'OK') {
-                        history = hres.history || [];
-
-                        // 按查询关键词过滤历史（大小写不敏感，匹配 title/url/uploader/artist）
-                        try {
-                            const q = (query || '').toString().trim().toLowerCase();
-                            if (q) {
-                                history = history.filter(item => {
-                                    try {
-                                        const title = (item.title || item.name || '').toString().toLowerCase();
-                                        const url = (item.url || item.rel || '').toString().toLowerCase();
-                                        const uploader = (item.uploader || item.artist || '').toString().toLowerCase();
-                                        return title.includes(q) || url.includes(q) || uploader.includes(q);
-                                    } catch (e) {
-                                        return false;
-                                    }
-                                });
-                            }
-                        } catch (e) {
-                            console.warn('[搜索] 播放历史过滤失败:', e);
-                        }
-                    }
-                } catch (e) {
-                    console.warn('[搜索] 获取播放历史失败:', e);
-                    history = [];
-                }
 
-                // 渲染搜索结果（包含已过滤的播放历史标签）
-                this.renderSearchResults(localResults, youtubeResults, history);
+            // 流中已逐段渲染过则无需重复渲染（避免重置用户已切换的标签）
+            if (!rendered) {
+                this.renderSearchResults(result.local || [], result.youtube || [], await historyPromise);
+            }
             
         } catch (error) {
             console.error('搜索失败:', error);
@@ -269,8 +252,42 @@ export class SearchManager {
         }
     }
 
+    // 拉取已合并的播放历史并按 query 过滤（在搜索结果中作为独立标签显示）
+    async fetchHistoryMatches(query) {
+        let history = [];
+        try {
+            const hres = await api.getPlaybackHistoryMerged();
+            if (hres && hres.status === 'OK') {
+                history = hres.history || [];
+
+                // 按查询关键词过滤历史（大小写不敏感，匹配 title/url/uploader/artist）
+                try {
+                    const q = (query || '').toString().trim().toLowerCase();
+                    if (q) {
+                        history = history.filter(item => {
+                            try {
+                                const title = (item.title || item.name || '').toString().toLowerCase();
+                                const url = (item.url || item.rel || '').toString().toLowerCase();
+                                const uploader = (item.uploader || item.artist || '').toString().toLowerCase();
+                                return title.includes(q) || url.includes(q) || uploader.includes(q);
+                            } catch (e) {
+                                return false;
+                            }
+                        });
+                    }
+                } catch (e) {
+                    console.warn('[搜索] 播放历史过滤失败:', e);
+                }
+            }
+        } catch (e) {
+            console.warn('[搜索] 获取播放历史失败:', e);
+            history = [];
+        }
+        return history;
+    }
+
     // 渲染搜索结果
-    renderSearchResults(localResults, youtubeResults, historyResults = []) {
+    renderSearchResults(localResults, youtubeResults, historyResults = [], youtubePending = false) {
         const searchModalBody = document.getElementById('searchModalBody');
         if (!searchModalBody) return;
         const buildList = (items, type) => {
@@ -307,7 +324,7 @@ export class SearchManager {
         searchModalBody.innerHTML = `
             <div class="search-tabs">
                 <button class="search-tab ${defaultTab === 'local' ? 'active' : ''}" data-tab="local">本地 (${localResults.length})</button>
-                <button class="search-tab ${defaultTab === 'youtube' ? 'active' : ''}" data-tab="youtube">网络 (${youtubeResults.length})</button>
+                <button class="search-tab ${defaultTab === 'youtube' ? 'active' : ''}" data-tab="youtube">网络 (${youtubePending ? '…' : youtubeResults.length})</button>
                     <button class="search-tab ${defaultTab === 'history' ? 'active' : ''}" data-tab="history">播放历史 (${historyResults.length})</button>
             </div>
             <div class="search-tab-panels">
@@ -315,7 +332,7 @@ export class SearchManager {
                     ${buildList(localResults, 'local')}
                 </div>
                 <div class="search-results-panel ${defaultTab === 'youtube' ? 'active' : ''}" data-panel="youtube">
-                    ${buildList(youtubeResults, 'youtube')}
+                    ${youtubePending ? '<div class="search-empty">搜索中…</div>' : buildList(youtubeResults, 'youtube')}
                 </div>
                     <div class="search-results-panel ${defaultTab === 'history' ? 'active' : ''}" data-panel="history">
                         ${buildList(historyResults, 'history')}
@@ -712,13 +729,13 @@ export class SearchManager {
     }
 
     // 搜索歌曲
-    async search(query) {
+    async search(query, onChunk) {
         if (!query || !query.trim()) {
             throw new Error('搜索关键词不能为空');
         }
 
         try {
-            const result = await api.searchSong(query.trim());
+            const result = await api.searchSongStream(query.trim(), onChunk);
             this.addToHistory(query.trim());
             return result;
         } catch (error) {
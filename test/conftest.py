@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+pytest 公共夹具
+
+app.py 在导入时会初始化全局单例（播放器、歌单管理器等）并在当前目录
+读写 playlists.json 等数据文件，因此在临时目录中导入，避免污染仓库。
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """在临时工作目录中导入 app 模块（缺少 FastAPI 时跳过）"""
+    pytest.importorskip("fastapi")
+    data_dir = tmp_path_factory.mktemp("clubmusic")
+    old_cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        import app
+        yield app
+    finally:
+        os.chdir(old_cwd)
+
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    """FastAPI TestClient（缺少 httpx 时跳过）"""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    return TestClient(app_module.app)
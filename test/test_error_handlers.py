@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+全局错误处理测试：所有错误响应统一为 {"status": "ERROR", "error": ...}
+
+运行:
+  python -m pytest test/test_error_handlers.py
+"""
+
+import orjson
+
+
+def test_unknown_route_uses_uniform_error_shape(client):
+    response = client.get("/does_not_exist")
+    assert response.status_code == 404
+    assert response.json() == {"status": "ERROR", "error": "Not Found"}
+
+
+def test_method_not_allowed_keeps_allow_header(client):
+    response = client.get("/pause")
+    assert response.status_code == 405
+    assert response.json()["status"] == "ERROR"
+    assert "POST" in response.headers["allow"]
+
+
+def test_raised_http_exception_detail_is_reported(client):
+    response = client.get("/cover/no/such/file.mp3")
+    assert response.status_code == 404
+    assert response.json()["status"] == "ERROR"
+    assert response.json()["error"]
+
+
+def test_validation_error_is_400(client):
+    response = client.post("/seek", json={"percent": "abc"})
+    assert response.status_code == 400
+    assert response.json()["status"] == "ERROR"
+
+
+def test_error_helper_truncates_message(app_module):
+    response = app_module._error(ValueError("x" * 5000), 502)
+    assert response.status_code == 502
+    body = orjson.loads(response.body)
+    assert body["status"] == "ERROR"
+    assert len(body["error"]) == app_module.ERROR_MESSAGE_MAX_LEN
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+GZip 压缩与 ETag 协商测试
+
+运行:
+  python -m pytest test/test_gzip_etag.py
+"""
+
+
+def _big_tree():
+    return {"name": "music", "files": [{"name": f"歌曲{i}.mp3", "rel": f"歌曲{i}.mp3"} for i in range(200)]}
+
+
+def test_tree_weak_etag_shared_by_gzip_and_identity(app_module, client, monkeypatch):
+    """gzip 与未压缩表示共用弱 ETag，并带 Vary: Accept-Encoding"""
+    monkeypatch.setattr(app_module.PLAYER, "local_file_tree", _big_tree())
+
+    gz = client.get("/tree", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/tree", headers={"Accept-Encoding": "identity"})
+
+    assert gz.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert gz.headers["etag"].startswith('W/"')
+    assert gz.headers["etag"] == plain.headers["etag"]
+    assert "Accept-Encoding" in gz.headers["vary"]
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_tree_not_modified(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.PLAYER, "local_file_tree", _big_tree())
+    etag = client.get("/tree").headers["etag"]
+
+    response = client.get("/tree", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_index_uses_weak_etag(app_module, client):
+    if app_module.INDEX_HTML is None:
+        return
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["etag"].startswith('W/"')
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    cached = client.get("/", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.headers["cache-control"] == "no-cache"
+
+
+def test_stream_search_is_never_gzipped(app_module, client, monkeypatch):
+    """流式搜索不经过 GZip，逐行推送不会被压缩缓冲攒住"""
+    async def fake_local(query):
+        return [{"url": f"/music/{i}.mp3", "title": "x" * 50} for i in range(100)]
+
+    async def fake_youtube(query):
+        return []
+
+    monkeypatch.setattr(app_module, "_search_local_timed", fake_local)
+    monkeypatch.setattr(app_module, "_search_youtube_timed", fake_youtube)
+
+    response = client.post(
+        "/search_song/stream", json={"query": "a"}, headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert len(response.content) > 1024
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+/song_add_to_history 请求解析与重复上报去重测试
+
+运行:
+  python -m pytest test/test_history_dedup.py
+"""
+
+import pytest
+
+
+class RecordingHistory:
+    def __init__(self):
+        self.urls = []
+
+    def add_to_history(self, url, title, is_local=False, thumbnail_url=None):
+        self.urls.append(url)
+
+
+@pytest.fixture
+def history(app_module, monkeypatch):
+    recorder = RecordingHistory()
+    monkeypatch.setattr(app_module.PLAYER, "playback_history", recorder)
+    monkeypatch.setattr(app_module, "_recent_history", {})
+    return recorder
+
+
+def _client_from(app_module, host):
+    from fastapi.testclient import TestClient
+    return TestClient(app_module.app, client=(host, 50000))
+
+
+def test_same_client_same_url_is_deduped(client, history):
+    for _ in range(3):
+        assert client.post("/song_add_to_history", json={"url": "/music/a.mp3"}).status_code == 200
+    assert history.urls == ["/music/a.mp3"]
+
+
+def test_other_url_does_not_reset_window(client, history):
+    """窗口按 URL 区分：穿插其它歌曲不会让同一首歌的重复上报漏过"""
+    for url in ("/music/a.mp3", "/music/b.mp3", "/music/a.mp3"):
+        client.post("/song_add_to_history", json={"url": url})
+    assert history.urls == ["/music/a.mp3", "/music/b.mp3"]
+
+
+def test_different_clients_are_recorded(app_module, history):
+    """不同客户端几乎同时播放同一首歌时各自记录"""
+    for host in ("10.0.0.1", "10.0.0.2"):
+        _client_from(app_module, host).post("/song_add_to_history", json={"url": "/music/a.mp3"})
+    assert history.urls == ["/music/a.mp3", "/music/a.mp3"]
+
+
+def test_window_expiry(app_module, client, history, monkeypatch):
+    monkeypatch.setattr(app_module, "HISTORY_DEDUP_WINDOW", 0.0)
+    client.post("/song_add_to_history", json={"url": "/music/a.mp3"})
+    client.post("/song_add_to_history", json={"url": "/music/a.mp3"})
+    assert history.urls == ["/music/a.mp3", "/music/a.mp3"]
+
+
+def test_accepts_legacy_form_bodies(client, history):
+    client.post("/song_add_to_history", data={"url": "/music/form.mp3"})
+    client.post("/song_add_to_history", files={"url": (None, "/music/multipart.mp3")})
+    assert history.urls == ["/music/form.mp3", "/music/multipart.mp3"]
+
+
+@pytest.mark.parametrize("body", [b"5", b"[1]", b'"x"', b"{bad"])
+def test_rejects_non_object_body(client, history, body):
+    response = client.post(
+        "/song_add_to_history", content=body, headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 400
+    assert response.json()["status"] == "ERROR"
+    assert history.urls == []
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+MPV 持久 IPC 连接测试
+
+用内存中的 FakeMpvPipe 模拟 MPV JSON IPC：每写入一行命令即回复一行，
+带 request_id 的命令回复中带回同一 request_id。管道“可读”即回复队列非空。
+
+运行:
+  python -m pytest test/test_mpv_ipc.py
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+import pytest
+
+from models import player as player_module
+from models.player import MusicPlayer
+
+
+class FakeMpvPipe:
+    """模拟 MPV IPC 管道：按顺序为每个命令帧生成一行回复"""
+
+    def __init__(self, properties=None):
+        self.properties = properties or {}
+        self.replies = deque()
+        self.commands = []
+        self.silent = set()  # 不回复的命令名（模拟卡住的 MPV）
+        self.fail_write = 0  # 接下来写入失败的次数
+        self.fail_read = False
+
+    def write(self, data: bytes):
+        if self.fail_write:
+            self.fail_write -= 1
+            raise BrokenPipeError("pipe closed")
+        for line in data.decode("utf-8").splitlines():
+            request = json.loads(line)
+            self.commands.append(request["command"])
+            if request["command"][0] in self.silent:
+                continue
+            reply = {"error": "success"}
+            if request["command"][0] == "get_property":
+                reply["data"] = self.properties.get(request["command"][1])
+            if "request_id" in request:
+                reply["request_id"] = request["request_id"]
+            self.replies.append((json.dumps(reply) + "\n").encode("utf-8"))
+
+    def readline(self):
+        if self.fail_read:
+            raise BrokenPipeError("pipe closed")
+        if not self.replies:
+            raise AssertionError("读取了不存在的回复（真实管道上会永久阻塞）")
+        return self.replies.popleft()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def player(monkeypatch):
+    """只初始化 IPC 相关字段的播放器实例，连接指向 FakeMpvPipe"""
+    pipe = FakeMpvPipe({"pause": False, "volume": 55.0, "duration": 180.0})
+    player = MusicPlayer.__new__(MusicPlayer)
+    player.pipe_name = "fake-pipe"
+    player._req_id = 0
+    player._ipc = None
+    player._ipc_pipe_name = None
+    player._ipc_lock = threading.Lock()
+    player._ipc_unread = 0
+    player._req_id_lock = threading.Lock()
+
+    def fake_open(name, mode, buffering):
+        assert name == "fake-pipe"
+        return pipe
+
+    monkeypatch.setattr("builtins.open", fake_open)
+    monkeypatch.setattr(player_module, "_ipc_wait_readable", lambda f, timeout: bool(f.replies))
+    player.fake_pipe = pipe
+    return player
+
+
+def test_fire_and_forget_replies_are_drained(player):
+    """不等待回复的命令，其回复在发送时即被读走，不会堆积在管道中"""
+    for _ in range(5):
+        assert player.mpv_command(["set_property", "volume", 30])
+    assert not player.fake_pipe.replies
+    assert player._ipc_unread == 0
+
+
+def test_get_many_single_write(player):
+    result = player.mpv_get_many(("pause", "volume", "duration"))
+    assert result == {"pause": False, "volume": 55.0, "duration": 180.0}
+    assert not player.fake_pipe.replies
+    assert player.fake_pipe.commands[0] == ["disable_event", "all"]
+
+
+def test_get_after_commands_skips_stale_replies(player):
+    player.mpv_command(["stop"])
+    player.mpv_command(["cycle", "pause"])
+    assert player.mpv_get("volume") == 55.0
+    assert not player.fake_pipe.replies
+
+
+def test_cycle_pause_reads_toggled_state(player):
+    player.fake_pipe.properties["pause"] = True
+    assert player.cycle_pause() is True
+
+
+def test_request_ids_are_unique_across_threads(player):
+    ids = []
+    lock = threading.Lock()
+
+    def allocate():
+        local = [player._next_request_id() for _ in range(500)]
+        with lock:
+            ids.extend(local)
+
+    threads = [threading.Thread(target=allocate) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(ids) == len(set(ids)) == 4000
+
+
+def test_fire_and_forget_does_not_wait_for_reply(player):
+    """不等待回复的命令只写入：MPV 尚未回复时也立即返回"""
+    player.fake_pipe.silent.add("stop")
+    assert player.mpv_command(["stop"])
+    assert player.fake_pipe.commands[-1] == ["stop"]
+
+
+def test_stalled_reply_times_out_and_drops_connection(player, monkeypatch):
+    """回复超时后放弃连接，不会一直占着 IPC 锁"""
+    waits = []
+
+    def wait_readable(f, timeout):
+        waits.append(timeout)
+        return bool(f.replies)
+
+    monkeypatch.setattr(player_module, "_ipc_wait_readable", wait_readable)
+    player.fake_pipe.silent.add("get_property")
+
+    assert player.mpv_get("volume") is None
+    assert player_module._MPV_IPC_REPLY_TIMEOUT in waits
+    assert player._ipc is None
+    assert player._ipc_lock.acquire(blocking=False)
+    player._ipc_lock.release()
+
+
+def test_read_failure_does_not_resend(player):
+    """写入成功后读取出错时不重发，非幂等命令不会执行两次"""
+    player.mpv_get("volume")  # 建立连接
+    player.fake_pipe.commands.clear()
+    player.fake_pipe.fail_read = True
+
+    assert player.cycle_pause() is None
+    assert player.fake_pipe.commands.count(["cycle", "pause"]) == 1
+    assert player._ipc is None
+
+
+def test_write_failure_reconnects_and_resends_once(player):
+    player.mpv_get("volume")
+    player.fake_pipe.commands.clear()
+    player.fake_pipe.fail_write = 1
+
+    assert player.mpv_get("volume") == 55.0
+    assert player.fake_pipe.commands.count(["get_property", "volume"]) == 1
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX 管道测试")
+def test_wait_readable_times_out_on_posix_pipe():
+    read_fd, write_fd = os.pipe()
+    with open(read_fd, "rb", 0) as f, open(write_fd, "wb", 0) as w:
+        assert not player_module._ipc_wait_readable(f, 0.01)
+        w.write(b'{"error":"success"}\n')
+        assert player_module._ipc_wait_readable(f, 0.01)
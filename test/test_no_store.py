@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+修改类接口的 Cache-Control: no-store 测试
+
+MPV 相关调用通过 monkeypatch 替换，不需要真实的 MPV 进程。
+
+运行:
+  python -m pytest test/test_no_store.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def fake_mpv(app_module, monkeypatch):
+    """替换播放器的 MPV IPC 调用"""
+    player = app_module.PLAYER
+    monkeypatch.setattr(player, "mpv_command", lambda cmd: None)
+    monkeypatch.setattr(player, "mpv_get", lambda prop: 42.0)
+    monkeypatch.setattr(player, "cycle_pause", lambda: True)
+    monkeypatch.setattr(app_module, "_volume_cache", {"volume": None, "expires": 0.0})
+    return player
+
+
+def _assert_no_store(response):
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    assert response.headers["content-type"].startswith("application/json")
+
+
+def test_settings_mutations_are_no_store(client):
+    _assert_no_store(client.post("/settings", json={"theme": "dark"}))
+    _assert_no_store(client.post("/settings/theme", json={"value": "dark"}))
+    _assert_no_store(client.post("/settings/reset"))
+
+
+def test_volume_set_and_read_are_no_store(client, fake_mpv):
+    response = client.post("/volume", json={"value": 30})
+    _assert_no_store(response)
+    assert response.json()["volume"] == 30
+
+    response = client.post("/volume", json={})
+    _assert_no_store(response)
+
+
+def test_volume_accepts_legacy_form(client, fake_mpv):
+    response = client.post("/volume", data={"value": "120"})
+    _assert_no_store(response)
+    assert response.json()["volume"] == 100
+
+
+def test_pause_and_loop_are_no_store(client, fake_mpv):
+    response = client.post("/pause")
+    _assert_no_store(response)
+    assert response.json()["paused"] is True
+    _assert_no_store(client.post("/loop"))
+
+
+def test_playlist_play_is_no_store(app_module, client, fake_mpv, monkeypatch):
+    monkeypatch.setattr(fake_mpv, "play", lambda song, **kwargs: True)
+    monkeypatch.setattr(fake_mpv, "current_index", -1)
+    monkeypatch.setattr(app_module, "CURRENT_SONGS", [{"url": "/music/a.mp3", "title": "a"}])
+
+    response = client.post("/playlist_play", data={"index": "0"})
+
+    _assert_no_store(response)
+    assert fake_mpv.current_index == 0
+
+
+@pytest.mark.parametrize("body", [b"5", b"[1]", b'"x"', b"{bad"])
+def test_volume_rejects_non_object_body(client, fake_mpv, body):
+    """JSON 数组、标量和非法 JSON 都返回 400，而不是 500"""
+    response = client.post("/volume", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+    assert response.json()["status"] == "ERROR"
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+歌单条目规范化（NormalizedSong）回归测试
+
+运行:
+  python -m pytest test/test_normalized_song.py
+"""
+
+from models.song import LocalSong, StreamSong
+
+
+def test_local_entry_without_title_uses_file_name(app_module):
+    """本地歌曲缺少标题时显示文件名（不含扩展名），而不是完整路径"""
+    entry = app_module.NormalizedSong.from_entry({"url": "/music/周杰伦 - 晴天.mp3", "title": ""})
+    assert entry.title == "周杰伦 - 晴天"
+    assert entry.kind == app_module.KIND_LOCAL
+
+    entry = app_module.NormalizedSong.from_entry({"url": "/music/晴天.flac"})
+    assert entry.title == "晴天"
+
+
+def test_local_entry_keeps_explicit_title(app_module):
+    entry = app_module.NormalizedSong.from_entry({"url": "/music/a.mp3", "title": "自定义标题"})
+    assert entry.title == "自定义标题"
+
+
+def test_stream_entry_without_title_falls_back_to_url(app_module):
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    entry = app_module.NormalizedSong.from_entry({"url": url, "type": "local"})
+    assert entry.kind == app_module.KIND_STREAM
+    assert entry.type == "youtube"
+    assert entry.title == url
+
+
+def test_to_song_builds_matching_class(app_module):
+    local = app_module.NormalizedSong.from_entry({"url": "/music/晴天.mp3"}).to_song()
+    assert isinstance(local, LocalSong)
+    assert local.title == "晴天"
+
+    stream = app_module.NormalizedSong.from_entry(
+        {"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "title": "Song"}
+    ).to_song()
+    assert isinstance(stream, StreamSong)
+    assert stream.title == "Song"
+
+
+def test_to_song_builds_fresh_object(app_module):
+    """每次播放构造新的 Song 对象，不复用上次播放时被修改过的实例"""
+    entry = app_module.NormalizedSong.from_entry({"url": "/music/a.mp3", "title": "a"})
+    assert entry.to_song() is not entry.to_song()
+
+
+def test_local_song_builder_derives_title(app_module):
+    """/next、/prev 构造本地歌曲时，空标题交给 LocalSong 从文件名推断"""
+    entry = app_module.NormalizedSong("/music/sub/夜曲.mp3", "", "local", 0, app_module.KIND_LOCAL)
+    song = entry.to_song()
+    assert isinstance(song, LocalSong)
+    assert song.title == "夜曲"
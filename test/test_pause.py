@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+/pause 接口测试（MPV 调用通过 monkeypatch 替换）
+
+运行:
+  python -m pytest test/test_pause.py
+"""
+
+
+def test_pause_returns_cycled_state(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.PLAYER, "cycle_pause", lambda: False)
+    response = client.post("/pause")
+    assert response.json() == {"status": "OK", "paused": False}
+
+
+def test_pause_falls_back_to_property_read(app_module, client, monkeypatch):
+    """批量读取没有回复时退回单独读取 pause 属性，仍返回布尔值"""
+    reads = []
+
+    def fake_get(prop):
+        reads.append(prop)
+        return True
+
+    monkeypatch.setattr(app_module.PLAYER, "cycle_pause", lambda: None)
+    monkeypatch.setattr(app_module.PLAYER, "mpv_get", fake_get)
+
+    response = client.post("/pause")
+
+    assert reads == ["pause"]
+    assert response.json() == {"status": "OK", "paused": True}
+
+
+def test_pause_reports_error_when_state_unknown(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.PLAYER, "cycle_pause", lambda: None)
+    monkeypatch.setattr(app_module.PLAYER, "mpv_get", lambda prop: None)
+
+    response = client.post("/pause")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "ERROR"
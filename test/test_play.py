@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+/play 播放接口测试
+
+PLAYER.play 通过 monkeypatch 替换，不需要真实的 MPV 进程。
+
+运行:
+  python -m pytest test/test_play.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def songs(app_module, monkeypatch):
+    """在当前歌单中放两首歌，并记录 current_index 的原值"""
+    items = [
+        {"url": "/music/a.mp3", "title": "a", "type": "local"},
+        {"url": "/music/b.mp3", "title": "b", "type": "local"},
+    ]
+    monkeypatch.setattr(app_module.CURRENT_PLAYLIST_REF, "songs", items)
+    monkeypatch.setattr(app_module.PLAYER, "current_index", -1)
+    return items
+
+
+def test_play_updates_index_inside_play_lock(app_module, client, songs, monkeypatch):
+    """current_index 与状态缓存失效在 _PLAY_LOCK 内完成，并发的 /next 读不到旧索引"""
+    lock_held = []
+    invalidate = app_module._invalidate_status
+
+    def checked_invalidate():
+        lock_held.append(app_module._PLAY_LOCK.locked())
+        invalidate()
+
+    monkeypatch.setattr(app_module.PLAYER, "play", lambda song, **kwargs: True)
+    monkeypatch.setattr(app_module, "_invalidate_status", checked_invalidate)
+
+    response = client.post("/play", json={"url": "/music/b.mp3", "title": "b"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "OK"
+    assert app_module.PLAYER.current_index == 1
+    assert lock_held == [True]
+
+
+def test_play_failure_returns_error(app_module, client, songs, monkeypatch):
+    monkeypatch.setattr(app_module.PLAYER, "play", lambda song, **kwargs: False)
+
+    response = client.post("/play", json={"url": "/music/b.mp3", "title": "b"})
+
+    assert response.status_code == 500
+    assert response.json() == {"status": "ERROR", "error": "播放失败"}
+    assert app_module.PLAYER.current_index == -1
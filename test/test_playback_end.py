@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+播放结束自动播放（handle_playback_end）测试
+
+运行:
+  python -m pytest test/test_playback_end.py
+"""
+
+from models.player import MusicPlayer
+from models.playlists import Playlists
+
+
+def test_playback_end_marks_dirty_instead_of_saving(app_module, tmp_path, monkeypatch):
+    """事件线程中删除播放完毕的歌曲后只标记脏数据，不在线程中直接写盘"""
+    manager = Playlists(data_file=str(tmp_path / "playlists.json"))
+    default = manager.create_playlist("正在播放")
+    manager._playlists[app_module.DEFAULT_PLAYLIST_ID] = default
+    default.songs.append({"url": "/music/done.mp3", "title": "done", "type": "local"})
+
+    notified = []
+    manager.set_dirty_listener(lambda: notified.append(manager.version))
+    saves = []
+    monkeypatch.setattr(manager, "save", lambda: saves.append(1))
+    monkeypatch.setattr(app_module, "PLAYLISTS_MANAGER", manager)
+
+    player = MusicPlayer.__new__(MusicPlayer)
+    player.current_meta = {"url": "/music/done.mp3", "title": "done"}
+    player.current_index = 0
+
+    player.handle_playback_end()
+
+    assert default.songs == []
+    assert notified
+    assert manager.has_unsaved_changes()
+    assert saves == []
+    assert player.current_index == -1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Playlist.reorder 区间轮转测试
+
+运行:
+  python -m pytest test/test_playlist_reorder.py
+"""
+
+import itertools
+
+from models.playlists import Playlist
+
+
+def _songs(*names):
+    return [{"url": f"/music/{name}.mp3", "title": name, "type": "local"} for name in names]
+
+
+def _expected(songs, from_index, to_index):
+    """参考实现：先移除再插入"""
+    songs = list(songs)
+    songs.insert(to_index, songs.pop(from_index))
+    return songs
+
+
+def test_reorder_matches_pop_insert_for_all_moves():
+    original = _songs(*"012345")
+    for from_index, to_index in itertools.product(range(6), repeat=2):
+        playlist = Playlist(name="测试", songs=list(original))
+        assert playlist.reorder(from_index, to_index)
+        assert playlist.songs == _expected(original, from_index, to_index), (from_index, to_index)
+
+
+def test_reorder_is_in_place():
+    """原地修改：已持有的歌曲列表引用（如 CURRENT_SONGS）保持有效"""
+    playlist = Playlist(name="测试", songs=_songs("a", "b", "c", "d"))
+    songs = playlist.songs
+    playlist.reorder(0, 3)
+    assert songs is playlist.songs
+    assert songs == _songs("b", "c", "d", "a")
+
+
+def test_reorder_rejects_invalid_indices():
+    playlist = Playlist(name="测试", songs=_songs("a", "b", "c"))
+    for from_index, to_index in ((None, 1), (1, None), (-1, 1), (0, 3), (3, 0)):
+        assert not playlist.reorder(from_index, to_index)
+    assert playlist.songs == _songs("a", "b", "c")
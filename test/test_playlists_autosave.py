@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+歌单延迟写盘（自动保存）测试
+
+运行:
+  python -m pytest test/test_playlists_autosave.py
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from models.playlists import Playlists
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return Playlists(data_file=str(tmp_path / "playlists.json"))
+
+
+def _saved_names(manager):
+    with open(manager.data_file, "rb") as f:
+        return [pl["name"] for pl in orjson.loads(f.read())["playlists"]]
+
+
+def _fail_writes(monkeypatch, manager, calls):
+    def failing_write(version, payload):
+        calls.append(version)
+        raise OSError("No space left on device")
+    monkeypatch.setattr(manager, "write_snapshot", failing_write)
+
+
+def test_save_failure_keeps_dirty(manager, monkeypatch):
+    """同步保存失败时保留脏标记"""
+    calls = []
+    _fail_writes(monkeypatch, manager, calls)
+
+    manager.save()
+
+    assert calls
+    assert manager.dirty
+
+
+def test_commit_without_listener_saves_immediately(manager):
+    manager.create_playlist("立即保存")
+    assert "立即保存" in _saved_names(manager)
+    assert not manager.dirty
+
+
+def test_commit_with_listener_only_marks_dirty(manager):
+    notified = []
+    manager.set_dirty_listener(lambda: notified.append(1))
+
+    manager.create_playlist("延迟保存")
+
+    assert manager.dirty
+    assert notified
+    assert "延迟保存" not in _saved_names(manager)
+
+
+def _run_autosave(app_module, manager, monkeypatch, body):
+    """在事件循环中运行自动保存任务，执行 body(dirty_event) 后取消任务"""
+    monkeypatch.setattr(app_module, "PLAYLISTS_MANAGER", manager)
+    monkeypatch.setattr(app_module, "PLAYLISTS_SAVE_INTERVAL", 0.01)
+    monkeypatch.setattr(app_module, "PLAYLISTS_SAVE_RETRY_INTERVAL", 0.01)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        dirty_event = asyncio.Event()
+        manager.set_dirty_listener(lambda: loop.call_soon_threadsafe(dirty_event.set))
+        task = asyncio.create_task(app_module._playlists_autosave_loop(dirty_event))
+        try:
+            await body()
+        finally:
+            task.cancel()
+            manager.set_dirty_listener(None)
+
+    asyncio.run(main())
+
+
+def test_autosave_coalesces_bursts(app_module, manager, monkeypatch):
+    """窗口内的多次修改合并为一次写盘"""
+    writes = []
+    original_write = manager.write_snapshot
+
+    def counting_write(version, payload):
+        writes.append(version)
+        original_write(version, payload)
+
+    monkeypatch.setattr(manager, "write_snapshot", counting_write)
+
+    async def body():
+        for i in range(20):
+            manager.create_playlist(f"歌单{i}")
+        await asyncio.sleep(0.2)
+
+    _run_autosave(app_module, manager, monkeypatch, body)
+
+    assert len(writes) == 1
+    assert not manager.dirty
+    assert "歌单19" in _saved_names(manager)
+
+
+def test_autosave_failure_is_retried(app_module, manager, monkeypatch):
+    """写盘失败后重新标记脏数据，稍后重试直到成功"""
+    calls = []
+    original_write = manager.write_snapshot
+
+    def flaky_write(version, payload):
+        calls.append(version)
+        if len(calls) == 1:
+            raise OSError("No space left on device")
+        original_write(version, payload)
+
+    monkeypatch.setattr(manager, "write_snapshot", flaky_write)
+
+    async def body():
+        manager.create_playlist("重试保存")
+        await asyncio.sleep(0.3)
+
+    _run_autosave(app_module, manager, monkeypatch, body)
+
+    assert len(calls) == 2
+    assert not manager.dirty
+    assert "重试保存" in _saved_names(manager)
+
+
+def test_autosave_failure_leaves_changes_dirty(app_module, manager, monkeypatch):
+    """持续写盘失败时修改仍标记为未保存，关闭时的最终写盘不会跳过"""
+    calls = []
+    _fail_writes(monkeypatch, manager, calls)
+
+    async def body():
+        manager.create_playlist("写不进去")
+        await asyncio.sleep(0.1)
+
+    _run_autosave(app_module, manager, monkeypatch, body)
+
+    assert calls
+    assert manager.dirty
+    assert manager.has_unsaved_changes()
+
+
+def test_loaded_data_has_no_unsaved_changes(manager):
+    assert not manager.has_unsaved_changes()
+    reloaded = Playlists(data_file=manager.data_file)
+    assert not reloaded.has_unsaved_changes()
+
+
+def test_unsaved_changes_tracks_written_version(manager, monkeypatch):
+    """写盘失败后即使 dirty 被清除，版本比较仍能发现未保存的修改"""
+    manager.set_dirty_listener(lambda: None)
+    manager.create_playlist("待保存")
+    assert manager.has_unsaved_changes()
+
+    calls = []
+    _fail_writes(monkeypatch, manager, calls)
+    version, payload = manager.snapshot()
+    with pytest.raises(OSError):
+        manager.write_snapshot(version, payload)
+    assert not manager.dirty
+    assert manager.has_unsaved_changes()
+
+    monkeypatch.undo()
+    manager.save()
+    assert not manager.has_unsaved_changes()
+    assert "待保存" in _saved_names(manager)
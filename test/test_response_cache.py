@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+ETag/304 辅助函数与按歌单版本号缓存的响应测试
+
+运行:
+  python -m pytest test/test_response_cache.py
+"""
+
+import pytest
+
+from models.playlists import Playlists
+
+
+@pytest.fixture
+def manager(app_module, tmp_path, monkeypatch):
+    """独立的歌单管理器，并清空各响应缓存"""
+    manager = Playlists(data_file=str(tmp_path / "playlists.json"))
+    manager.load()
+    monkeypatch.setattr(app_module, "PLAYLISTS_MANAGER", manager)
+    monkeypatch.setattr(app_module, "_playlists_cache", {"version": -1, "body": b"", "etag": ""})
+    monkeypatch.setattr(app_module, "_playlist_songs_cache", {"version": -1, "body": b""})
+    monkeypatch.setattr(app_module, "_playlist_body_cache", {})
+    return manager
+
+
+def test_make_etag_is_weak_and_deterministic(app_module):
+    etag = app_module._make_etag("playlists", 3)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == app_module._make_etag("playlists", 3)
+    assert etag != app_module._make_etag("playlists", 4)
+    assert etag != app_module._make_etag("playlist", 3)
+
+
+def test_not_modified_response(app_module):
+    response = app_module._not_modified('W/"abc"')
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+def test_playlists_304_until_version_changes(client, manager):
+    first = client.get("/playlists")
+    etag = first.headers["etag"]
+    assert client.get("/playlists", headers={"If-None-Match": etag}).status_code == 304
+
+    manager.create_playlist("新歌单")
+
+    second = client.get("/playlists", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert "新歌单" in [pl["name"] for pl in second.json()["playlists"]]
+
+
+def test_playlists_cached_body_reused_within_version(app_module, client, manager):
+    client.get("/playlists")
+    body = app_module._playlists_cache["body"]
+    client.get("/playlists")
+    assert app_module._playlists_cache["body"] is body
+
+
+def test_playlist_songs_refreshes_on_version_change(app_module, client, manager, monkeypatch):
+    songs = [{"url": "/music/a.mp3", "title": "a", "type": "local"}]
+    monkeypatch.setattr(app_module, "CURRENT_SONGS", songs)
+
+    assert [s["url"] for s in client.get("/playlist_songs").json()["songs"]] == ["/music/a.mp3"]
+
+    # 版本号未变时返回缓存内容
+    songs.append({"url": "/music/b.mp3", "title": "b", "type": "local"})
+    assert len(client.get("/playlist_songs").json()["songs"]) == 1
+
+    manager.mark_dirty()
+    assert len(client.get("/playlist_songs").json()["songs"]) == 2
+
+
+def test_playlist_etag_tracks_version_and_index(app_module, client, manager, monkeypatch):
+    etag = client.get("/playlist").headers["etag"]
+    assert client.get("/playlist", headers={"If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(app_module.PLAYER, "current_index", app_module.PLAYER.current_index + 1)
+    moved = client.get("/playlist", headers={"If-None-Match": etag})
+    assert moved.status_code == 200
+    assert moved.json()["current_index"] == app_module.PLAYER.current_index
+
+    manager.mark_dirty()
+    assert client.get("/playlist", headers={"If-None-Match": moved.headers["etag"]}).status_code == 200
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+/search_song/stream 流式搜索测试
+
+运行:
+  python -m pytest test/test_search_stream.py
+"""
+
+import asyncio
+
+import orjson
+
+
+def _lines(response):
+    return [orjson.loads(line) for line in response.content.splitlines() if line.strip()]
+
+
+def test_stream_emits_local_before_slow_youtube(app_module, client, monkeypatch):
+    """本地结果先完成时先输出，前端可以不等 YouTube 搜索就渲染"""
+    async def fake_local(query):
+        return [{"url": "/music/a.mp3", "title": "a"}]
+
+    async def fake_youtube(query):
+        await asyncio.sleep(0.05)
+        return [{"url": "https://www.youtube.com/watch?v=abc", "title": "b"}]
+
+    monkeypatch.setattr(app_module, "_search_local_timed", fake_local)
+    monkeypatch.setattr(app_module, "_search_youtube_timed", fake_youtube)
+
+    response = client.post("/search_song/stream", json={"query": "a"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(response)
+    assert [list(line) for line in lines] == [["local"], ["youtube"]]
+    assert lines[0]["local"][0]["title"] == "a"
+
+
+def test_stream_reports_failed_source(app_module, client, monkeypatch):
+    """某一来源失败时该行带 error，其余结果照常输出"""
+    async def fake_local(query):
+        return []
+
+    async def failing_youtube(query):
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(app_module, "_search_local_timed", fake_local)
+    monkeypatch.setattr(app_module, "_search_youtube_timed", failing_youtube)
+
+    lines = _lines(client.post("/search_song/stream", json={"query": "a"}))
+    youtube = next(line for line in lines if "youtube" in line)
+    assert youtube["youtube"] == []
+    assert "network down" in youtube["error"]
+
+
+def test_stream_url_query_skips_local_search(app_module, client, monkeypatch):
+    """URL 查询只做 YouTube 提取"""
+    async def unexpected_local(query):
+        raise AssertionError("URL 查询不应搜索本地")
+
+    async def fake_youtube(query):
+        return []
+
+    monkeypatch.setattr(app_module, "_search_local_timed", unexpected_local)
+    monkeypatch.setattr(app_module, "_search_youtube_timed", fake_youtube)
+
+    lines = _lines(client.post("/search_song/stream", json={"query": "https://youtu.be/abc"}))
+    assert lines == [{"youtube": []}]
+
+
+def test_stream_rejects_empty_query(client):
+    response = client.post("/search_song/stream", json={"query": "  "})
+    assert response.status_code == 400
+    assert response.json()["status"] == "ERROR"
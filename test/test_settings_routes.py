@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+设置接口路由测试
+
+运行:
+  python -m pytest test/test_settings_routes.py
+"""
+
+
+def test_reset_is_not_shadowed_by_key_route(app_module, client):
+    """/settings/reset 必须命中 reset_settings，而不是 /settings/{key}"""
+    response = client.post("/settings/reset")
+
+    assert response.status_code == 200
+    assert response.content == app_module.DEFAULT_SETTINGS_JSON
+    assert response.json()["data"] == app_module.DEFAULT_SETTINGS
+
+
+def test_update_known_setting(client):
+    response = client.post("/settings/theme", json={"value": "light"})
+    assert response.status_code == 200
+    assert response.json()["data"] == {"theme": "light"}
+
+
+def test_update_unknown_setting_is_rejected(client):
+    response = client.post("/settings/not_a_setting", json={"value": 1})
+    assert response.status_code == 400
+    assert response.json()["status"] == "ERROR"
+
+
+def test_get_settings_returns_prebuilt_body(app_module, client):
+    response = client.get("/settings")
+    assert response.status_code == 200
+    assert response.content == app_module.DEFAULT_SETTINGS_RESPONSE_JSON
+
+
+def test_schema_not_modified_uses_shared_headers(client):
+    """设置描述的 304 与 200 带相同的弱 ETag、Vary 和 Cache-Control"""
+    first = client.get("/settings/schema")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get("/settings/schema", headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+    for name in ("etag", "cache-control", "vary"):
+        assert cached.headers[name] == first.headers[name]
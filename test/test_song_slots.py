@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Song __slots__ 回归测试
+
+Song 及其子类使用 __slots__ 固定属性，任何对未声明属性的 setattr
+都会抛出 AttributeError。这里覆盖播放历史等会动态写属性的调用路径。
+
+运行:
+  python -m pytest test/test_song_slots.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.song import Song, LocalSong, StreamSong
+from models.playlist import PlayHistory
+
+
+def test_song_has_no_instance_dict():
+    """Song 及子类都不应带 __dict__（否则 __slots__ 失去意义）"""
+    for song in (
+        Song("a.mp3", "A"),
+        LocalSong("/music/a.mp3", title="A"),
+        StreamSong("https://www.youtube.com/watch?v=abc", title="B"),
+    ):
+        assert not hasattr(song, "__dict__")
+
+
+def test_song_rejects_undeclared_attribute():
+    """未在 __slots__ 中声明的属性不能写入"""
+    song = StreamSong("https://www.youtube.com/watch?v=abc", title="B")
+    with pytest.raises(AttributeError):
+        song.name = "x"
+
+
+def test_history_only_attributes_are_slotted():
+    """play_count / ts / timestamps 仅播放历史使用，但必须可写"""
+    song = LocalSong("/music/a.mp3", title="A")
+    song.play_count = 3
+    song.ts = 100
+    song.timestamps = "100,200"
+    assert (song.play_count, song.ts, song.timestamps) == (3, 100, "100,200")
+
+
+@pytest.mark.parametrize("is_local", [True, False])
+def test_history_update_item_title(is_local):
+    """update_item(title=...) 更新最新一条历史的标题"""
+    history = PlayHistory(max_size=10)
+    url = "/music/a.mp3" if is_local else "https://www.youtube.com/watch?v=abc"
+    history.add_to_history(url, "加载中…", is_local=is_local)
+    version = history.version
+
+    history.update_item(0, title="真实标题")
+
+    item = history.get_all()[0]
+    assert item["title"] == "真实标题"
+    assert item["name"] == "真实标题"
+    assert history.version == version + 1
+
+
+def test_history_update_item_name_alias():
+    """name 是 to_dict 中 title 的别名，update_item(name=...) 不能因 __slots__ 抛异常"""
+    history = PlayHistory(max_size=10)
+    history.add_to_history("https://www.youtube.com/watch?v=abc", "加载中…")
+
+    history.update_item(0, name="真实标题")
+
+    assert history.get_all()[0]["title"] == "真实标题"
+
+
+def test_history_update_item_out_of_range_is_noop():
+    """索引越界时不修改、不递增版本号"""
+    history = PlayHistory(max_size=10)
+    history.update_item(0, title="x")
+    assert history.version == 0
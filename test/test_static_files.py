@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+静态文件服务（CachedStaticFiles）测试
+
+运行:
+  python -m pytest test/test_static_files.py
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def static_client(app_module, tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    (tmp_path / "app.js").write_text("console.log(1);", encoding="utf-8")
+    static = FastAPI()
+    static.mount("/static", app_module.CachedStaticFiles(directory=str(tmp_path)), name="static")
+    return TestClient(static), tmp_path
+
+
+def test_edited_file_gets_new_etag_immediately(static_client):
+    """缓存的路径命中时仍重新 stat，编辑后的文件立即返回新内容和新 ETag"""
+    client, root = static_client
+    first = client.get("/static/app.js")
+    assert first.status_code == 200
+
+    path = root / "app.js"
+    path.write_text("console.log('edited');", encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    second = client.get("/static/app.js", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.text == "console.log('edited');"
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+def test_unchanged_file_revalidates(static_client):
+    client, _ = static_client
+    etag = client.get("/static/app.js").headers["etag"]
+    response = client.get("/static/app.js", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_deleted_and_created_files(static_client):
+    """删除的文件返回 404，未找到的路径不缓存，新建后可立即访问"""
+    client, root = static_client
+    assert client.get("/static/app.js").status_code == 200
+    os.remove(root / "app.js")
+    assert client.get("/static/app.js").status_code == 404
+
+    assert client.get("/static/new.js").status_code == 404
+    (root / "new.js").write_text("1", encoding="utf-8")
+    assert client.get("/static/new.js").status_code == 200
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+/status 响应缓存测试
+
+运行:
+  python -m pytest test/test_status_cache.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def builds(app_module, monkeypatch):
+    """替换 _build_status，记录调用次数；返回内容带上调用序号"""
+    calls = []
+    hooks = []
+
+    async def fake_build():
+        calls.append(1)
+        for hook in hooks:
+            hook()
+        return {"status": "OK", "build": len(calls)}
+
+    monkeypatch.setattr(app_module, "_build_status", fake_build)
+    monkeypatch.setitem(app_module._status_cache, "body", None)
+    monkeypatch.setitem(app_module._status_cache, "expires", 0.0)
+    monkeypatch.setattr(app_module, "STATUS_CACHE_TTL", 60.0)
+    return calls, hooks
+
+
+def test_polls_share_cached_body(client, builds):
+    calls, _ = builds
+    assert client.get("/status").json()["build"] == 1
+    assert client.get("/status").json()["build"] == 1
+    assert len(calls) == 1
+
+
+def test_invalidate_forces_rebuild(app_module, client, builds):
+    calls, _ = builds
+    client.get("/status")
+    app_module._invalidate_status()
+    assert client.get("/status").json()["build"] == 2
+
+
+def test_invalidate_during_build_is_not_overwritten(app_module, client, builds):
+    """查询进行中发生失效（如 /next 切歌）时，过时结果不写回缓存"""
+    calls, hooks = builds
+    hooks.append(app_module._invalidate_status)
+    assert client.get("/status").json()["build"] == 1
+
+    hooks.clear()
+    assert client.get("/status").json()["build"] == 2
+    assert client.get("/status").json()["build"] == 2
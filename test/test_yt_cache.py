@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+yt-dlp 结果缓存与并发请求合并（single-flight）测试
+
+运行:
+  python -m pytest test/test_yt_cache.py
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def yt(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "_yt_cache", OrderedDict())
+    monkeypatch.setattr(app_module, "_yt_inflight", {})
+    return app_module
+
+
+def _slow(calls, result, delay=0.05):
+    lock = threading.Lock()
+
+    def func(*args):
+        with lock:
+            calls.append(args)
+        time.sleep(delay)
+        return result
+    return func
+
+
+def test_concurrent_calls_share_one_execution(yt):
+    calls = []
+    func = _slow(calls, {"status": "OK", "data": [1]})
+
+    async def main():
+        return await asyncio.gather(
+            *(yt._yt_cached_call(("search", "q", 5), yt._yt_status_ok, func, "q", 5) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == {"status": "OK", "data": [1]} for r in results)
+    assert not yt._yt_inflight
+
+
+def test_success_is_cached(yt):
+    calls = []
+    func = _slow(calls, {"status": "OK"}, delay=0)
+
+    async def main():
+        await yt._yt_cached_call("k", yt._yt_status_ok, func)
+        await yt._yt_cached_call("k", yt._yt_status_ok, func)
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_failure_is_not_cached(yt):
+    calls = []
+    func = _slow(calls, {"status": "ERROR", "error": "boom"}, delay=0)
+
+    async def main():
+        await yt._yt_cached_call("k", yt._yt_status_ok, func)
+        return await yt._yt_cached_call("k", yt._yt_status_ok, func)
+
+    assert asyncio.run(main())["status"] == "ERROR"
+    assert len(calls) == 2
+    assert "k" not in yt._yt_cache
+
+
+def test_expired_entry_is_refetched(yt, monkeypatch):
+    monkeypatch.setattr(yt, "_YT_CACHE_TTL", -1)
+    calls = []
+    func = _slow(calls, ["video"], delay=0)
+
+    async def main():
+        await yt._yt_cached_call("k", bool, func)
+        await yt._yt_cached_call("k", bool, func)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_lru_eviction(yt, monkeypatch):
+    monkeypatch.setattr(yt, "_YT_CACHE_MAX", 2)
+    yt._yt_cache_put("a", 1)
+    yt._yt_cache_put("b", 2)
+    assert yt._yt_cache_get("a") == 1  # 访问后 a 变为最近使用
+    yt._yt_cache_put("c", 3)
+    assert list(yt._yt_cache) == ["a", "c"]
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call(yt):
+    """某个请求断开（被取消）时，其他等待同一 key 的请求仍能拿到结果"""
+    calls = []
+    func = _slow(calls, {"status": "OK"}, delay=0.1)
+
+    async def main():
+        first = asyncio.create_task(yt._yt_cached_call("k", yt._yt_status_ok, func))
+        second = asyncio.create_task(yt._yt_cached_call("k", yt._yt_status_ok, func))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == {"status": "OK"}
+    assert len(calls) == 1
+    assert yt._yt_cache_get("k") == {"status": "OK"}